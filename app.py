@@ -3,6 +3,12 @@ from routes.company_routes import company_routes
 from routes.student_routes import student_routes
 from routes.admin_routes import admin_routes
 from routes.auth_routes import auth_routes
+from routes.notification_routes import notification_routes
+from db import release_request_connection
+from models.job import start_view_flusher, start_job_sweeper
+from models.activity_log import start_activity_writer
+from models.notification import start_notification_writer
+from profiler import init_profiler
 
 app = Flask(__name__)
 
@@ -13,6 +19,26 @@ app.register_blueprint(auth_routes)
 app.register_blueprint(admin_routes)
 app.register_blueprint(student_routes)
 app.register_blueprint(company_routes)
+app.register_blueprint(notification_routes)
+
+# Return each request's pooled database connection when the request ends
+app.teardown_appcontext(release_request_connection)
+
+# Record the SQL each request runs (see /admin/diagnostics)
+init_profiler(app)
+
+# Write buffered job views back to the database in the background
+start_view_flusher()
+
+# Write audit events to activity_logs in the background
+start_activity_writer()
+
+# Tell students about new jobs in the background
+start_notification_writer()
+
+# Close jobs past their deadline (full jobs are closed by the insert trigger).
+# Started with the first request so scripts that import the app don't sweep.
+app.before_request(start_job_sweeper)
 
 # Home route
 @app.route('/')
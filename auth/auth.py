@@ -2,12 +2,100 @@
 Authentication utilities for password hashing and verification.
 Includes password strength validation and security features.
 """
+import atexit
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from werkzeug.security import generate_password_hash, check_password_hash
 
-# Password hashing method - using pbkdf2:sha256 (default, secure)
-# You can customize the method if needed
-PASSWORD_HASH_METHOD = 'pbkdf2:sha256:600000'
+# Password hashing policy - pbkdf2:sha256 with a configurable iteration count.
+# Hashes below this policy are upgraded on the next successful login.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 600000))
+PASSWORD_HASH_METHOD = f'pbkdf2:sha256:{PASSWORD_HASH_ITERATIONS}'
+
+# Hashing runs in a process pool so request threads are not pinned on PBKDF2.
+# PASSWORD_HASH_WORKERS=0 hashes inline in the calling thread instead.
+# Workers are started from a fork server (or spawned where that is not
+# available) rather than forked from a process that already runs threads.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+# Hashes allowed to be queued or running at once; beyond that, fail fast
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 4))
+# Seconds to wait for a result before giving up
+PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+
+class HashingOverloadedError(Exception):
+    """Raised when too many password hashes are already pending."""
+
+
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(max(PASSWORD_HASH_MAX_PENDING, 1))
+_bulk_hash_slots = threading.BoundedSemaphore(max(PASSWORD_HASH_MAX_PENDING // 2, 1))
+
+
+def _get_hash_executor():
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _hash_executor = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context(start_method)
+                )
+                atexit.register(_hash_executor.shutdown, wait=False, cancel_futures=True)
+    return _hash_executor
+
+
+def _discard_hash_executor(executor):
+    """Drop a broken pool (e.g. a worker was OOM-killed) so the next call starts a new one."""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is executor:
+            _hash_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_hashing(fn, *args, retry_broken=True):
+    """
+    Run a hashing function in the worker pool. If the pool is broken it is
+    replaced and the call retried once.
+    
+    Raises:
+        HashingOverloadedError: If PASSWORD_HASH_MAX_PENDING hashes are already
+            pending, or the result does not arrive within PASSWORD_HASH_TIMEOUT
+        BrokenProcessPool: If the replacement pool breaks as well
+    """
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+    
+    if not _hash_slots.acquire(blocking=False):
+        raise HashingOverloadedError("Too many password operations in progress")
+    
+    executor = _get_hash_executor()
+    try:
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            _hash_slots.release()
+            raise
+        future.add_done_callback(lambda _: _hash_slots.release())
+        
+        try:
+            return future.result(timeout=PASSWORD_HASH_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingOverloadedError("Password operation timed out")
+    except BrokenProcessPool:
+        _discard_hash_executor(executor)
+        if not retry_broken:
+            raise
+        return _run_hashing(fn, *args, retry_broken=False)
+
 
 def hash_password(password):
     """
@@ -21,6 +109,7 @@ def hash_password(password):
         
     Raises:
         ValueError: If password is empty or None
+        HashingOverloadedError: If the hashing pool is saturated
     """
     if not password:
         raise ValueError("Password cannot be empty")
@@ -28,7 +117,45 @@ def hash_password(password):
     if not isinstance(password, str):
         raise ValueError("Password must be a string")
     
-    return generate_password_hash(password, method=PASSWORD_HASH_METHOD.split(':')[0])
+    return _run_hashing(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def hash_passwords(passwords):
+    """
+    Hash many passwords in parallel on the worker pool (bulk imports).
+    
+    Unlike hash_password(), this waits for free slots instead of failing
+    fast, and never holds more than half of PASSWORD_HASH_MAX_PENDING so
+    logins can still get through.
+    
+    Args:
+        passwords (list): Plain text passwords
+        
+    Returns:
+        list: Hashed password strings, in the same order
+    """
+    if PASSWORD_HASH_WORKERS <= 0:
+        return [generate_password_hash(p, PASSWORD_HASH_METHOD) for p in passwords]
+    
+    executor = _get_hash_executor()
+    futures = []
+    try:
+        for password in passwords:
+            _bulk_hash_slots.acquire()
+            _hash_slots.acquire()
+            try:
+                future = executor.submit(generate_password_hash, password, PASSWORD_HASH_METHOD)
+            except Exception:
+                _hash_slots.release()
+                _bulk_hash_slots.release()
+                raise
+            future.add_done_callback(lambda _: (_hash_slots.release(), _bulk_hash_slots.release()))
+            futures.append(future)
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # The caller sees the failure; later calls get a fresh pool
+        _discard_hash_executor(executor)
+        raise
 
 
 def verify_password(password, hashed_password):
@@ -41,16 +168,44 @@ def verify_password(password, hashed_password):
         
     Returns:
         bool: True if password matches, False otherwise
+        
+    Raises:
+        HashingOverloadedError: If the hashing pool is saturated
     """
     if not password or not hashed_password:
         return False
     
     try:
-        return check_password_hash(hashed_password, password)
-    except Exception:
+        return _run_hashing(check_password_hash, hashed_password, password)
+    except ValueError:
+        # Malformed or unsupported stored hash
         return False
 
 
+def password_needs_rehash(hashed_password):
+    """
+    Check whether a stored hash is weaker than the current policy.
+    
+    Args:
+        hashed_password (str): Stored password hash
+        
+    Returns:
+        bool: True if the hash should be regenerated with PASSWORD_HASH_METHOD
+    """
+    if not hashed_password or hashed_password.count('$') < 2:
+        return True
+    
+    method = hashed_password.split('$', 1)[0].split(':')
+    if method[0] != 'pbkdf2' or len(method) < 2 or method[1] != 'sha256':
+        return True
+    
+    try:
+        iterations = int(method[2]) if len(method) > 2 else 0
+    except ValueError:
+        return True
+    return iterations < PASSWORD_HASH_ITERATIONS
+
+
 def validate_password_strength(password):
     """
     Validate password strength.
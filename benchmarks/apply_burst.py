@@ -0,0 +1,179 @@
+"""
+Benchmark: thousands of students applying to one job at the same time.
+
+Creates a throwaway company, job and student accounts, fires concurrent
+applications at the job and reports throughput, latency and outcomes.
+Everything it creates is deleted afterwards.
+
+Point it at a scratch database, never production:
+
+    DB_NAME=placement_bench python -m benchmarks.apply_burst --students 5000 --workers 32
+    DB_NAME=placement_bench python -m benchmarks.apply_burst --legacy
+
+--legacy runs the old has_applied() + plain INSERT path for comparison.
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def setup(get_db_connection, students, max_applications):
+    """Create one company, one job and `students` student profiles."""
+    tag = uuid.uuid4().hex[:8]
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.execute(
+        "INSERT INTO users (username, email, password, role) VALUES (%s, %s, 'x', 'company')",
+        (f"bench_co_{tag}", f"bench_co_{tag}@example.com")
+    )
+    company_user_id = cur.lastrowid
+    cur.execute(
+        "INSERT INTO companies (user_id, company_name) VALUES (%s, %s)",
+        (company_user_id, f"Bench Co {tag}")
+    )
+    company_id = cur.lastrowid
+    cur.execute(
+        """
+        INSERT INTO jobs (company_id, title, description, eligibility, max_applications)
+        VALUES (%s, 'Benchmark role', 'Benchmark', 'Any', %s)
+        """,
+        (company_id, max_applications)
+    )
+    job_id = cur.lastrowid
+
+    for start in range(0, students, 1000):
+        rows = [(f"bench_{tag}_{i}", f"bench_{tag}_{i}@example.com")
+                for i in range(start, min(start + 1000, students))]
+        cur.executemany(
+            "INSERT INTO users (username, email, password, role) VALUES (%s, %s, 'x', 'student')",
+            rows
+        )
+    cur.execute("SELECT id FROM users WHERE username LIKE %s", (f"bench\\_{tag}\\_%",))
+    user_ids = [row[0] for row in cur.fetchall()]
+    cur.executemany(
+        "INSERT IGNORE INTO students (user_id, name) VALUES (%s, 'Bench Student')",
+        [(uid,) for uid in user_ids]
+    )
+    cur.execute(
+        "SELECT s.id FROM students s JOIN users u ON s.user_id = u.id WHERE u.username LIKE %s",
+        (f"bench\\_{tag}\\_%",)
+    )
+    student_ids = [row[0] for row in cur.fetchall()]
+
+    conn.commit()
+    cur.close()
+    conn.close()
+    return tag, job_id, student_ids
+
+
+def teardown(get_db_connection, tag):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    # Cascades remove students, companies, jobs and applications
+    cur.execute(
+        "DELETE FROM users WHERE username LIKE %s OR username = %s",
+        (f"bench\\_{tag}\\_%", f"bench_co_{tag}")
+    )
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def legacy_apply(student_id, job_id):
+    """The previous two-connection path: has_applied() then a plain INSERT."""
+    from db import get_db_connection
+    from models.application import has_applied
+
+    if has_applied(student_id, job_id):
+        return {'status': 'already_applied'}
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "INSERT INTO applications (student_id, job_id) VALUES (%s, %s)",
+            (student_id, job_id)
+        )
+        conn.commit()
+        return {'status': 'applied'}
+    except Exception as e:
+        conn.rollback()
+        return {'status': type(e).__name__}
+    finally:
+        cur.close()
+        conn.close()
+
+
+def run(args):
+    os.environ.setdefault("DB_POOL_SIZE", str(args.workers))
+    os.environ.setdefault("DB_POOL_MAX_OVERFLOW", "0")
+
+    from db import get_db_connection, get_pool_stats
+    from models.application import apply_for_job
+
+    apply_fn = legacy_apply if args.legacy else apply_for_job
+    max_applications = args.max_applications or args.students
+    tag, job_id, student_ids = setup(get_db_connection, args.students, max_applications)
+
+    # Every student applies once; --duplicates re-submits that share of them
+    attempts = student_ids + student_ids[:int(len(student_ids) * args.duplicates)]
+    latencies = []
+
+    def attempt(student_id):
+        start = time.perf_counter()
+        try:
+            status = apply_fn(student_id, job_id)['status']
+        except Exception as e:
+            status = type(e).__name__
+        latencies.append(time.perf_counter() - start)
+        return status
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            outcomes = Counter(pool.map(attempt, attempts))
+        elapsed = time.perf_counter() - start
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT current_applications, (SELECT COUNT(*) FROM applications WHERE job_id = %s) FROM jobs WHERE id = %s",
+            (job_id, job_id)
+        )
+        counter, actual = cur.fetchone()
+        cur.close()
+        conn.close()
+    finally:
+        teardown(get_db_connection, tag)
+
+    latencies.sort()
+    print(f"path:              {'legacy' if args.legacy else 'atomic'}")
+    print(f"attempts:          {len(attempts)} ({args.workers} workers)")
+    print(f"elapsed:           {elapsed:.2f}s")
+    print(f"throughput:        {len(attempts) / elapsed:.0f} attempts/s")
+    print(f"latency p50/p95:   {statistics.median(latencies) * 1000:.1f} / "
+          f"{latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms")
+    print(f"outcomes:          {dict(outcomes)}")
+    print(f"max_applications:  {max_applications}, stored: {actual}, counter: {counter}")
+    print(f"pool:              {get_pool_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--max-applications", type=int, default=None,
+                        help="job capacity (default: number of students)")
+    parser.add_argument("--duplicates", type=float, default=0.1,
+                        help="share of students that submit twice")
+    parser.add_argument("--legacy", action="store_true",
+                        help="benchmark the old has_applied + INSERT path")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
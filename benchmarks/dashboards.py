@@ -0,0 +1,68 @@
+"""
+Serial versus concurrent dashboard queries.
+
+Times the data a dashboard needs read two ways: the synchronous model
+functions one after another, and the models.async_data coroutines gathered
+with run_concurrently(). Run against a database loaded by benchmarks.datagen:
+
+    DB_NAME=placement_bench python -m benchmarks.dashboards --runs 50
+
+Each call runs in its own app context, as a request would. Only the company
+dashboard reads independent queries; the admin and student dashboards are a
+single query each (stats.compute_admin_stats, student.get_student_dashboard_data).
+"""
+import argparse
+import json
+
+from benchmarks.suite import Fixtures, measure
+
+
+def cases(f):
+    """(dashboard, serial callable, concurrent callable)."""
+    from models import async_data, company, job
+
+    def company_serial():
+        profile = company.get_company_profile(f.company_user_id)
+        return profile, job.get_company_job_stats(profile["id"])
+
+    return [
+        ("company", company_serial,
+         lambda: async_data.run_concurrently(async_data.company_dashboard(f.company_user_id, f.company_id))),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per case")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    from app import app
+    from db import get_db_connection
+
+    with app.app_context():
+        fixtures = Fixtures(get_db_connection())
+
+    results = {}
+    print(f"{'dashboard':<10} {'serial p50':>11} {'concurrent p50':>15} {'serial p95':>11} "
+          f"{'concurrent p95':>15} {'speedup':>8}")
+    for name, serial, concurrent in cases(fixtures):
+        timings = {}
+        for mode, fn in (("serial", serial), ("concurrent", concurrent)):
+            def call(fn=fn):
+                with app.app_context():
+                    return fn()
+            timings[mode] = measure(call, args.runs)
+        results[name] = timings
+
+        s, c = timings["serial"], timings["concurrent"]
+        print(f"{name:<10} {s['median_ms']:>9.1f}ms {c['median_ms']:>13.1f}ms {s['p95_ms']:>9.1f}ms "
+              f"{c['p95_ms']:>13.1f}ms {s['median_ms'] / c['median_ms']:>7.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
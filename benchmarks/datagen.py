@@ -0,0 +1,303 @@
+"""
+Synthetic data for benchmarks.
+
+Loads database_schema_improved.sql into the configured database and fills it
+with a deterministic data set: the same --seed and --as-of date always
+produce the same rows. Tables are created first, rows are bulk-inserted, and
+triggers, views and procedures are created last so the load doesn't pay for
+a trigger per application (jobs.current_applications is written directly).
+
+Point it at a scratch database, never production. --reset drops the
+existing tables first; without it the database must be empty.
+
+    DB_NAME=placement_bench python -m benchmarks.datagen --reset
+    DB_NAME=placement_bench python -m benchmarks.datagen --reset --scale 0.05
+
+Default volumes: 50k students, 2k companies, 20k jobs, 2M applications.
+Every user's password is BENCH_PASSWORD; user 1 is an admin.
+"""
+import argparse
+import os
+import random
+import re
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.ranking import COURSES, SKILLS
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "database_schema_improved.sql")
+BENCH_PASSWORD = "Bench@1234"
+INSERT_CHUNK = 2000
+
+DEFAULT_VOLUMES = {
+    "students": 50000,
+    "companies": 2000,
+    "jobs": 20000,
+    "applications": 2000000,
+    "notifications": 250000,
+}
+
+TABLES = ("activity_logs", "notifications", "applications", "jobs",
+          "students", "companies", "users")
+
+TITLES = ["Software Engineer", "Backend Developer", "Frontend Developer", "Data Analyst",
+          "Data Scientist", "DevOps Engineer", "QA Engineer", "Product Analyst",
+          "ML Engineer", "Business Analyst", "Full Stack Developer", "Cloud Engineer"]
+LEVELS = ["Intern", "Graduate", "Junior", "Associate", ""]
+LOCATIONS = ["Bangalore", "Hyderabad", "Pune", "Chennai", "Mumbai", "Delhi NCR", "Remote"]
+INDUSTRIES = ["IT Services", "Product", "Fintech", "E-commerce", "Consulting", "Healthcare"]
+JOB_TYPES = ["full-time", "full-time", "full-time", "internship", "part-time", "contract"]
+APPLICATION_STATUSES = ["pending"] * 5 + ["reviewed"] * 2 + ["shortlisted", "accepted", "rejected", "rejected"]
+WORDS = ("build maintain scale design services customers teams product data platform "
+         "reliable fast secure ship features own review mentor collaborate improve").split()
+
+
+def split_schema(path=SCHEMA_PATH):
+    """
+    Statements from the schema file as (kind, sql), where kind is 'table'
+    for CREATE TABLE and 'post' for everything to run after the data load.
+    CREATE DATABASE / USE are skipped so the configured database is used.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line for line in f if not line.lstrip().startswith("--")]
+
+    statements, buffer, delimiter = [], [], ";"
+    for line in lines:
+        stripped = line.strip()
+        if stripped.upper().startswith("DELIMITER"):
+            delimiter = stripped.split()[1]
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            sql = "".join(buffer).strip()[:-len(delimiter)].strip()
+            buffer = []
+            if sql:
+                statements.append(sql)
+
+    result = []
+    for sql in statements:
+        head = re.sub(r"\s+", " ", sql[:40]).upper()
+        if head.startswith(("CREATE DATABASE", "USE ")):
+            continue
+        result.append(("table" if head.startswith("CREATE TABLE") else "post", sql))
+    return result
+
+
+def _ensure_database(db_config):
+    import mysql.connector
+
+    server = {k: v for k, v in db_config.items() if k != "database"}
+    conn = mysql.connector.connect(**server)
+    cur = conn.cursor()
+    cur.execute(f"CREATE DATABASE IF NOT EXISTS `{db_config['database']}` "
+                "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cur.close()
+    conn.close()
+
+
+def _reset(cur):
+    for name in ("update_job_application_count_insert", "update_job_application_count_delete"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for name in ("vw_active_jobs", "vw_student_applications"):
+        cur.execute(f"DROP VIEW IF EXISTS {name}")
+    for name in ("sp_get_company_job_stats", "sp_get_student_app_stats"):
+        cur.execute(f"DROP PROCEDURE IF EXISTS {name}")
+    cur.execute("SET foreign_key_checks = 0")
+    for table in TABLES:
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+    cur.execute("SET foreign_key_checks = 1")
+
+
+def _insert(conn, cur, sql, rows):
+    """Insert rows in INSERT_CHUNK-sized multi-row statements."""
+    for start in range(0, len(rows), INSERT_CHUNK):
+        cur.executemany(sql, rows[start:start + INSERT_CHUNK])
+        conn.commit()
+    return len(rows)
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate(conn, volumes, seed=42, as_of=None, password_hash=None, log=print):
+    """Insert the synthetic rows. Returns the number of rows per table."""
+    rng = random.Random(seed)
+    as_of = as_of or date.today()
+    now = datetime.combine(as_of, datetime.min.time()) + timedelta(hours=12)
+    students, companies = volumes["students"], volumes["companies"]
+    jobs, applications = volumes["jobs"], volumes["applications"]
+    counts = {}
+    cur = conn.cursor()
+    cur.execute("SET unique_checks = 0")
+
+    # Users: 1 admin, then companies, then students
+    started = time.perf_counter()
+    users = [(1, "bench_admin", "bench_admin@example.com", password_hash, "admin")]
+    users += [(1 + i, f"bench_company_{i}", f"bench_company_{i}@example.com", password_hash, "company")
+              for i in range(1, companies + 1)]
+    users += [(1 + companies + i, f"bench_student_{i}", f"bench_student_{i}@example.com", password_hash, "student")
+              for i in range(1, students + 1)]
+    counts["users"] = _insert(conn, cur,
+                              "INSERT INTO users (id, username, email, password, role) VALUES (%s, %s, %s, %s, %s)",
+                              users)
+
+    counts["companies"] = _insert(conn, cur, """
+        INSERT INTO companies (id, user_id, company_name, industry, hr_email, description, is_verified)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, [(i, 1 + i, f"Bench Company {i}", rng.choice(INDUSTRIES), f"hr{i}@example.com",
+               _sentence(rng, 30), rng.random() < 0.7) for i in range(1, companies + 1)])
+
+    student_rows = []
+    for i in range(1, students + 1):
+        complete = rng.random() < 0.85
+        student_rows.append((
+            i, 1 + companies + i, f"Student {i}", f"bench_student_{i}@example.com",
+            rng.choice(COURSES) if complete else None,
+            round(rng.uniform(5, 10), 2) if complete else None,
+            rng.randint(1, 4),
+            ", ".join(rng.sample(SKILLS, rng.randint(2, 10))),
+            complete,
+        ))
+    counts["students"] = _insert(conn, cur, """
+        INSERT INTO students (id, user_id, name, email, course, cgpa, year_of_study, skills, is_profile_complete)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, student_rows)
+    del student_rows
+    log(f"users, companies, students: {time.perf_counter() - started:.1f}s")
+
+    # Applications per job follow a skewed distribution; some jobs are full
+    started = time.perf_counter()
+    weights = [rng.paretovariate(1.5) for _ in range(jobs)]
+    scale = applications / sum(weights) if weights else 0
+    per_job = [min(int(w * scale), students) for w in weights]
+
+    job_rows, job_created = [], []
+    for job_id in range(1, jobs + 1):
+        created_at = now - timedelta(days=rng.uniform(0, 180))
+        roll = rng.random()
+        if roll < 0.1:
+            deadline = None
+        elif roll < 0.25:
+            deadline = as_of - timedelta(days=rng.randint(1, 60))
+        else:
+            deadline = as_of + timedelta(days=rng.randint(1, 90))
+        taken = per_job[job_id - 1]
+        capacity = taken if rng.random() < 0.15 else max(taken * 2, 100)
+        salary_min = rng.choice([3, 4, 5, 6, 8, 10, 12, 15]) * 100000
+        job_rows.append((
+            job_id, rng.randint(1, companies),
+            f"{rng.choice(LEVELS)} {rng.choice(TITLES)}".strip(),
+            " ".join(_sentence(rng, 12) for _ in range(4)),
+            ", ".join(rng.sample(SKILLS, rng.randint(3, 8))),
+            f"{' / '.join(rng.sample(COURSES, 2))} with CGPA above {rng.choice([6, 6.5, 7, 7.5, 8])}",
+            rng.choice(LOCATIONS), rng.choice(JOB_TYPES),
+            salary_min, salary_min + rng.choice([2, 3, 5]) * 100000,
+            # Expired and full jobs are closed, as the sweeper and trigger leave them
+            "closed" if rng.random() < 0.1 or (deadline and deadline < as_of) or taken >= capacity
+            else "active",
+            deadline, capacity, taken, rng.randint(0, 5000), created_at,
+        ))
+        job_created.append(created_at)
+    counts["jobs"] = _insert(conn, cur, """
+        INSERT INTO jobs (id, company_id, title, description, requirements, eligibility, location,
+                          job_type, salary_min, salary_max, status, application_deadline,
+                          max_applications, current_applications, views_count, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, job_rows)
+    del job_rows
+    log(f"jobs: {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    sql = "INSERT INTO applications (student_id, job_id, status, applied_at) VALUES (%s, %s, %s, %s)"
+    batch, total = [], 0
+    for job_id, taken in enumerate(per_job, start=1):
+        created_at = job_created[job_id - 1]
+        span = max((now - created_at).total_seconds(), 1)
+        for student_id in rng.sample(range(1, students + 1), taken):
+            batch.append((student_id, job_id, rng.choice(APPLICATION_STATUSES),
+                          created_at + timedelta(seconds=rng.uniform(0, span))))
+        if len(batch) >= INSERT_CHUNK * 10:
+            total += _insert(conn, cur, sql, batch)
+            batch = []
+    total += _insert(conn, cur, sql, batch)
+    counts["applications"] = total
+    log(f"applications: {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    notifications = [
+        (1 + companies + rng.randint(1, students), "new_job", "New job posted",
+         f"Bench Company {rng.randint(1, companies)} posted a new job.",
+         f"/apply/{rng.randint(1, jobs)}", rng.random() < 0.6)
+        for _ in range(volumes["notifications"] if students else 0)
+    ]
+    counts["notifications"] = _insert(conn, cur, """
+        INSERT INTO notifications (user_id, type, title, message, link, is_read)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """, notifications)
+    log(f"notifications: {time.perf_counter() - started:.1f}s")
+
+    cur.execute("SET unique_checks = 1")
+    cur.close()
+    return counts
+
+
+def build(volumes, seed=42, as_of=None, reset=False, log=print):
+    """Create the schema in the configured database and load the data set."""
+    import mysql.connector
+    from auth.auth import hash_password
+    from db import DB_CONFIG
+
+    _ensure_database(DB_CONFIG)
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cur = conn.cursor()
+    if reset:
+        _reset(cur)
+    else:
+        cur.execute("SHOW TABLES LIKE 'users'")
+        if cur.fetchone():
+            cur.close()
+            conn.close()
+            raise SystemExit(f"Database {DB_CONFIG['database']} already has tables; use --reset")
+
+    statements = split_schema()
+    for kind, sql in statements:
+        if kind == "table":
+            cur.execute(sql)
+    conn.commit()
+
+    counts = generate(conn, volumes, seed=seed, as_of=as_of,
+                      password_hash=hash_password(BENCH_PASSWORD), log=log)
+
+    for kind, sql in statements:
+        if kind == "post":
+            cur.execute(sql)
+    cur.execute("ANALYZE TABLE " + ", ".join(TABLES))
+    cur.fetchall()
+    conn.commit()
+    cur.close()
+    conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    for name, default in DEFAULT_VOLUMES.items():
+        parser.add_argument(f"--{name}", type=int, default=default)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every volume (e.g. 0.01 for a quick run)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="date deadlines and timestamps are relative to (default: today)")
+    parser.add_argument("--reset", action="store_true", help="drop existing tables first")
+    args = parser.parse_args()
+
+    volumes = {name: max(int(getattr(args, name) * args.scale), 1) for name in DEFAULT_VOLUMES}
+    started = time.perf_counter()
+    counts = build(volumes, seed=args.seed, as_of=args.as_of, reset=args.reset)
+    print(f"loaded {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmark: password verifications (logins) per second per core.
+
+Measures verify_password() inline on one thread, then through the hashing
+process pool with many concurrent callers, including how many calls were
+rejected by the queue-depth limit. Needs no database.
+
+    python -m benchmarks.password_hashing --logins 200 --clients 64
+    PASSWORD_HASH_WORKERS=4 PASSWORD_HASH_MAX_PENDING=16 python -m benchmarks.password_hashing
+"""
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run(args):
+    from werkzeug.security import check_password_hash
+    import auth.auth as auth
+
+    password = "drive-day-2024"
+    hashed = auth.hash_password(password)
+    workers = auth.PASSWORD_HASH_WORKERS or 1
+
+    # One core, no pool
+    start = time.perf_counter()
+    for _ in range(args.inline):
+        check_password_hash(hashed, password)
+    inline_rate = args.inline / (time.perf_counter() - start)
+
+    # Warm the pool up so process start-up is not measured
+    for _ in range(workers):
+        auth.verify_password(password, hashed)
+
+    def login(_):
+        try:
+            return "ok" if auth.verify_password(password, hashed) else "wrong"
+        except auth.HashingOverloadedError:
+            return "rejected"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as clients:
+        outcomes = Counter(clients.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - start
+
+    print(f"policy:                {auth.PASSWORD_HASH_METHOD}")
+    print(f"inline (1 core):       {inline_rate:.1f} logins/s")
+    print(f"pool workers:          {workers} (max pending {auth.PASSWORD_HASH_MAX_PENDING}, "
+          f"{os.cpu_count()} CPUs)")
+    print(f"{f'pool, {args.clients} clients:':<23}{outcomes['ok'] / elapsed:.1f} logins/s "
+          f"({outcomes['ok'] / elapsed / workers:.1f} per worker)")
+    print(f"outcomes:              {dict(outcomes)} in {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--inline", type=int, default=10,
+                        help="verifications timed on a single thread")
+    parser.add_argument("--logins", type=int, default=100,
+                        help="verifications submitted to the pool")
+    parser.add_argument("--clients", type=int, default=32,
+                        help="concurrent callers (simulated request threads)")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
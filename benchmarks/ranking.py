@@ -0,0 +1,78 @@
+"""
+Benchmark: ranking 10k applicants for one job.
+
+Generates deterministic synthetic applicants and times
+models.ranking.rank_applicants() (full sort and top-N). Needs no database.
+
+    python -m benchmarks.ranking --applicants 10000 --repeat 20
+"""
+import argparse
+import random
+import statistics
+import time
+from decimal import Decimal
+
+SKILLS = [
+    "python", "java", "c++", "javascript", "react", "node.js", "sql", "mysql",
+    "django", "flask", "aws", "docker", "kubernetes", "machine learning",
+    "pandas", "numpy", "git", "linux", "html", "css", "spring", "go", "rust",
+    "tensorflow", "excel", "communication", "data structures", "algorithms",
+]
+COURSES = ["B.Tech CSE", "B.Tech ECE", "B.Tech IT", "MCA", "BCA", "M.Tech CSE", "MBA", "B.Sc Physics"]
+
+JOB = {
+    "title": "Backend Engineer",
+    "requirements": "Python, Flask or Django, SQL/MySQL, Docker, AWS, Git, data structures and algorithms",
+    "eligibility": "B.Tech CSE / IT or MCA with CGPA above 7",
+}
+
+
+def make_applicants(count, seed=42):
+    rng = random.Random(seed)
+    return [
+        {
+            "application_id": i,
+            "student_name": f"Student {i}",
+            "skills": ", ".join(rng.sample(SKILLS, rng.randint(2, 10))),
+            "cgpa": Decimal(f"{rng.uniform(5, 10):.2f}") if rng.random() > 0.02 else None,
+            "course": rng.choice(COURSES),
+        }
+        for i in range(count)
+    ]
+
+
+def time_it(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args()
+
+    from models.ranking import rank_applicants
+
+    applicants = make_applicants(args.applicants)
+    rank_applicants(JOB, applicants[:10])  # warm up
+
+    full = time_it(lambda: rank_applicants(JOB, applicants), args.repeat)
+    top = time_it(lambda: rank_applicants(JOB, applicants, top_n=args.top), args.repeat)
+
+    best = rank_applicants(JOB, applicants, top_n=3)
+    print(f"applicants:        {args.applicants}")
+    print(f"full ranking:      median {full[0]:.1f} ms, max {full[1]:.1f} ms")
+    print(f"top {args.top}:            median {top[0]:.1f} ms, max {top[1]:.1f} ms")
+    for a in best:
+        print(f"  {a['score']:.3f}  {a['student_name']:<14} {a['course']:<11} "
+              f"cgpa={a['cgpa']}  matched={a['matched_skills']}")
+
+
+if __name__ == "__main__":
+    main()
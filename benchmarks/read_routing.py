@@ -0,0 +1,88 @@
+"""
+Check: reads go to replicas, writes and read-your-writes go to the primary.
+
+Needs a primary and at least one replica, e.g. two local MySQL instances
+with replication set up between them:
+
+    DB_REPLICA_HOSTS=127.0.0.1:3307 DB_READ_YOUR_WRITES=2 python -m benchmarks.read_routing
+
+Reports which server answered each step (by @@hostname:@@port), the routing
+counters and each replica's measured lag, and times a burst of reads.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def server_of(conn):
+    cur = conn.cursor()
+    cur.execute("SELECT CONCAT(@@hostname, ':', @@port)")
+    server = cur.fetchone()[0]
+    cur.close()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    from flask import session
+
+    import db
+    from app import app
+
+    if not db.DB_REPLICA_HOSTS:
+        raise SystemExit("Set DB_REPLICA_HOSTS to at least one replica")
+
+    def step(label, conn):
+        print(f"{label:<38} {conn._pool.name:<24} {server_of(conn)}")
+
+    with app.test_request_context():
+        step("read, no recent write", db.get_read_connection())
+        step("write", db.get_db_connection())
+
+        conn = db.get_db_connection()
+        cur = conn.cursor()
+        cur.execute("INSERT INTO activity_logs (action, details) VALUES ('routing_check', 'read_routing')")
+        conn.commit()
+        cur.close()
+        step("read after write, same request", db.get_read_connection())
+        last_write = session["db_last_write"]
+        db.release_request_connection()
+
+    with app.test_request_context():
+        session["db_last_write"] = last_write
+        step("read in the next request", db.get_read_connection())
+        db.release_request_connection()
+
+    time.sleep(db.DB_READ_YOUR_WRITES)
+    with app.test_request_context():
+        session["db_last_write"] = last_write
+        step("read after the window", db.get_read_connection())
+        db.release_request_connection()
+
+    def read(_):
+        with app.app_context():
+            conn = db.get_read_connection()
+            cur = conn.cursor()
+            cur.execute("SELECT COUNT(*) FROM jobs WHERE status = 'active'")
+            cur.fetchone()
+            cur.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(read, range(args.reads)))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{args.reads} reads in {elapsed:.2f}s ({args.reads / elapsed:.0f}/s, {args.workers} workers)")
+    stats = db.get_routing_stats()
+    print(f"routing:  {stats['routing']}")
+    for replica in stats["replicas"]:
+        print(f"replica {replica['host']}: healthy={replica['healthy']} lag={replica['lag']} "
+              f"error={replica['error']} checkouts={replica['pool']['checkouts']}")
+
+
+if __name__ == "__main__":
+    main()
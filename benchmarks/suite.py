@@ -0,0 +1,505 @@
+"""
+Benchmark suite for the model layer and dashboard pages.
+
+Times every public function in models/*.py, and each dashboard page through
+the Flask test client, against a database loaded by benchmarks.datagen. The
+result is a JSON report. Given --baseline, the report also compares every
+case with a stored run, and the exit status is 1 if any case got slower by
+more than --threshold.
+
+    DB_NAME=placement_bench python -m benchmarks.suite --output run.json
+    DB_NAME=placement_bench python -m benchmarks.suite --save-baseline baseline.json
+    DB_NAME=placement_bench python -m benchmarks.suite --baseline baseline.json
+
+Write cases change the data (new jobs and notifications, closed jobs, status
+updates), so reload with benchmarks.datagen before recording a baseline.
+The page cache (routes.response_cache) is off unless --response-cache is
+given, so pages are rendered on every run.
+"""
+import argparse
+import importlib
+import inspect
+import io
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+
+# Functions that manage process lifecycle rather than serve requests
+SKIPPED = {
+    "models.job.start_view_flusher": "starts a background thread",
+    "models.activity_log.start_activity_writer": "starts a background thread",
+    "models.job.start_job_sweeper": "starts a background thread",
+    "models.notification.start_notification_writer": "starts a background thread",
+}
+
+WRITE_RUNS = 5   # runs for cases that write (or fan out) a lot
+NOISE_MS = 0.5   # smaller absolute changes never count as regressions
+
+
+class Fixtures:
+    """Ids of representative rows in the benchmark database."""
+
+    def __init__(self, conn):
+        cur = conn.cursor(dictionary=True)
+
+        def one(sql, params=()):
+            cur.execute(sql, params)
+            row = cur.fetchone()
+            if row is None:
+                raise SystemExit("Benchmark database is empty; load it with benchmarks.datagen")
+            return row
+
+        self.admin_user_id = one("SELECT id FROM users WHERE role = 'admin' ORDER BY id LIMIT 1")["id"]
+
+        job = one("""
+            SELECT id, company_id, title, requirements, eligibility FROM jobs
+            WHERE status = 'active' ORDER BY current_applications DESC LIMIT 1
+        """)
+        self.job = job
+        self.job_id, self.company_id = job["id"], job["company_id"]
+        self.company_user_id = one("SELECT user_id FROM companies WHERE id = %s", (self.company_id,))["user_id"]
+
+        student = one("""
+            SELECT s.id, s.user_id, s.name, s.skills, u.email
+            FROM students s JOIN users u ON s.user_id = u.id
+            WHERE s.id = (SELECT student_id FROM applications
+                          GROUP BY student_id ORDER BY COUNT(*) DESC LIMIT 1)
+        """)
+        self.student_id, self.student_user_id = student["id"], student["user_id"]
+        self.student_name, self.student_skills = student["name"], student["skills"]
+        self.student_email = student["email"]
+
+        self.open_job_id = one("""
+            SELECT id FROM jobs
+            WHERE status = 'active'
+              AND (application_deadline IS NULL OR application_deadline >= CURDATE())
+              AND current_applications + 100 < max_applications
+            ORDER BY id LIMIT 1
+        """)["id"]
+        cur.execute("""
+            SELECT id FROM students
+            WHERE id NOT IN (SELECT student_id FROM applications WHERE job_id = %s)
+            ORDER BY id LIMIT 100
+        """, (self.open_job_id,))
+        self.new_applicants = [row["id"] for row in cur.fetchall()]
+
+        cur.execute("SELECT id FROM applications WHERE job_id = %s ORDER BY id LIMIT 100", (self.job_id,))
+        self.application_ids = [row["id"] for row in cur.fetchall()]
+
+        cur.execute("""
+            SELECT id FROM jobs WHERE company_id = %s AND status = 'active' AND id <> %s
+            ORDER BY id LIMIT 20
+        """, (self.company_id, self.job_id))
+        self.closable_job_ids = [row["id"] for row in cur.fetchall()]
+
+        self.volumes = {}
+        for table in ("users", "students", "companies", "jobs", "applications", "notifications"):
+            cur.execute(f"SELECT COUNT(*) AS n FROM {table}")
+            self.volumes[table] = cur.fetchone()["n"]
+        cur.close()
+
+
+def _next(items, name):
+    iterator = iter(items)
+
+    def take():
+        try:
+            return next(iterator)
+        except StopIteration:
+            raise RuntimeError(f"ran out of fixture rows for {name}") from None
+    return take
+
+
+def model_cases(f):
+    """(name, zero-argument callable, runs or None) for each model function."""
+    from models import activity_log, application, async_data, company, job, notification
+    from db import get_db_connection
+    from models import ranking, recommendations, stats, student, student_import, user
+
+    tag = uuid.uuid4().hex[:8]
+    counter = itertools.count()
+    applicants = application.get_applicants_for_company_job(f.company_id, f.job_id)
+    next_applicant = _next(f.new_applicants, "apply_for_job")
+    next_closable = _next(f.closable_job_ids, "close_job")
+    cursor = job.encode_job_cursor(job.get_job_board_page()["jobs"][-1])
+
+    def csv_batch():
+        n = next(counter)
+        rows = "".join(f"bench_{tag}_{n}_{i},bench_{tag}_{n}_{i}@example.com,Bench@1234,Imported {i}\n"
+                       for i in range(50))
+        return io.StringIO("username,email,password,name\n" + rows)
+
+    def unique_user():
+        n = next(counter)
+        return f"bench_{tag}_{n}", f"bench_{tag}_{n}@example.com"
+
+    def bump_shared_jobs_version():
+        conn = get_db_connection()
+        cur = conn.cursor()
+        job.bump_shared_jobs_version(cur)
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    return [
+        # activity_log
+        ("models.activity_log.log_activity", lambda: activity_log.log_activity("benchmark", "job", f.job_id), None),
+        ("models.activity_log.flush_activity_log", activity_log.flush_activity_log, None),
+        ("models.activity_log.get_activity_log_stats", activity_log.get_activity_log_stats, None),
+
+        # application
+        ("models.application.has_applied", lambda: application.has_applied(f.student_id, f.job_id), None),
+        ("models.application.apply_for_job",
+         lambda: application.apply_for_job(next_applicant(), f.open_job_id), WRITE_RUNS),
+        ("models.application.get_applications_for_student",
+         lambda: application.get_applications_for_student(f.student_id), None),
+        ("models.application.get_applicants_for_company_job",
+         lambda: application.get_applicants_for_company_job(f.company_id, f.job_id), None),
+        ("models.application.iter_applicants_for_export",
+         lambda: sum(1 for _ in application.iter_applicants_for_export(f.company_id, f.job_id)), None),
+        ("models.application.update_application_status",
+         lambda: application.update_application_status(f.application_ids[0], "reviewed"), WRITE_RUNS),
+        ("models.application.bulk_update_application_status",
+         lambda: application.bulk_update_application_status(f.company_id, f.job_id, f.application_ids, "reviewed"),
+         WRITE_RUNS),
+        ("models.application.get_application_by_id",
+         lambda: application.get_application_by_id(f.application_ids[0]), None),
+
+        # async_data
+        ("models.async_data.run_read",
+         lambda: async_data.run_concurrently(async_data.run_read(company.get_company_by_id, f.company_id)),
+         None),
+        ("models.async_data.run_concurrently",
+         lambda: async_data.run_concurrently(async_data.get_company_by_id(f.company_id),
+                                             async_data.get_job_by_id(f.job_id)), None),
+        ("models.async_data.company_dashboard",
+         lambda: async_data.run_concurrently(async_data.company_dashboard(f.company_user_id, f.company_id)),
+         None),
+
+        # company
+        ("models.company.get_company_id_by_user_id",
+         lambda: company.get_company_id_by_user_id(f.company_user_id), None),
+        ("models.company.save_company_profile",
+         lambda: company.save_company_profile(f.company_user_id, hr_phone="9999999999"), WRITE_RUNS),
+        ("models.company.get_company_profile", lambda: company.get_company_profile(f.company_user_id), None),
+        ("models.company.get_company_by_id", lambda: company.get_company_by_id(f.company_id), None),
+
+        # job
+        ("models.job.create_job",
+         lambda: job.create_job(f.company_id, "Benchmark role", "Benchmark description", "Any",
+                                requirements="python, sql"), 2),
+        ("models.job.close_job", lambda: job.close_job(f.company_id, next_closable()), WRITE_RUNS),
+        ("models.job.bump_jobs_version", job.bump_jobs_version, None),
+        ("models.job.bump_shared_jobs_version", bump_shared_jobs_version, WRITE_RUNS),
+        ("models.job.get_jobs_version", job.get_jobs_version, None),
+        ("models.job.note_jobs_closed", lambda: job.note_jobs_closed([10 ** 9]), None),
+        ("models.job.close_expired_jobs", job.close_expired_jobs, WRITE_RUNS),
+        ("models.job.get_job_sweep_stats", job.get_job_sweep_stats, None),
+        ("models.job.record_job_view", lambda: job.record_job_view(f.job_id), None),
+        ("models.job.flush_job_views", job.flush_job_views, None),
+        ("models.job.get_job_view_stats", job.get_job_view_stats, None),
+        ("models.job.get_jobs_by_company", lambda: job.get_jobs_by_company(f.company_id), None),
+        ("models.job.get_company_job_stats", lambda: job.get_company_job_stats(f.company_id), None),
+        ("models.job.get_active_jobs", job.get_active_jobs, None),
+        ("models.job.encode_job_cursor", lambda: job.encode_job_cursor({"id": f.job_id, "created_at": datetime(2024, 1, 1)}), None),
+        ("models.job.decode_job_cursor", lambda: job.decode_job_cursor(cursor), None),
+        ("models.job.get_job_board_page", job.get_job_board_page, None),
+        ("models.job.search_jobs", lambda: job.search_jobs(query="python developer"), None),
+        ("models.job.get_job_by_id", lambda: job.get_job_by_id(f.job_id), None),
+
+        # notification
+        ("models.notification.create_notifications",
+         lambda: notification.create_notifications(
+             [(f.student_user_id, "benchmark", "Benchmark", "Benchmark notification", None)] * 100),
+         WRITE_RUNS),
+        ("models.notification.notify_application_status",
+         lambda: notification.notify_application_status(f.application_ids, "reviewed"), WRITE_RUNS),
+        ("models.notification.notify_new_job",
+         lambda: notification.notify_new_job(f.job_id, f.job["title"], f.company_id), 2),
+        ("models.notification.queue_new_job_notification",
+         lambda: notification.queue_new_job_notification(f.job_id, f.job["title"], f.company_id), 2),
+        ("models.notification.flush_new_job_notifications", notification.flush_new_job_notifications, 2),
+        ("models.notification.get_notification_fanout_stats", notification.get_notification_fanout_stats, None),
+        ("models.notification.get_unread_count", lambda: notification.get_unread_count(f.student_user_id), None),
+        ("models.notification.get_notifications_page",
+         lambda: notification.get_notifications_page(f.student_user_id), None),
+        ("models.notification.mark_notifications_read",
+         lambda: notification.mark_notifications_read(f.student_user_id), WRITE_RUNS),
+
+        # ranking
+        ("models.ranking.tokenize", lambda: ranking.tokenize(f.job["requirements"]), None),
+        ("models.ranking.rank_applicants", lambda: ranking.rank_applicants(f.job, applicants), None),
+        ("models.ranking.get_ranked_applicants",
+         lambda: ranking.get_ranked_applicants(f.company_id, f.job_id, top_n=50), None),
+
+        # recommendations
+        ("models.recommendations.rebuild_index", recommendations.rebuild_index, WRITE_RUNS),
+        ("models.recommendations.index_job",
+         lambda: recommendations.index_job(10 ** 9, "Benchmark role", "python, sql"), None),
+        ("models.recommendations.unindex_jobs", lambda: recommendations.unindex_jobs([10 ** 9]), None),
+        ("models.recommendations.get_recommended_jobs",
+         lambda: recommendations.get_recommended_jobs(f.student_id, f.student_skills), None),
+
+        # stats
+        ("models.stats.compute_admin_stats", stats.compute_admin_stats, WRITE_RUNS),
+        ("models.stats.get_admin_stats", stats.get_admin_stats, None),
+        ("models.stats.adjust_admin_stats", lambda: stats.adjust_admin_stats(total_users=0), None),
+        ("models.stats.invalidate_admin_stats", stats.invalidate_admin_stats, None),
+
+        # student
+        ("models.student.get_student_id_by_user_id",
+         lambda: student.get_student_id_by_user_id(f.student_user_id), None),
+        ("models.student.save_student_profile",
+         lambda: student.save_student_profile(f.student_user_id, name=f.student_name), WRITE_RUNS),
+        ("models.student.get_student_profile", lambda: student.get_student_profile(f.student_user_id), None),
+        ("models.student.get_student_dashboard_data",
+         lambda: student.get_student_dashboard_data(f.student_user_id), None),
+
+        # student_import
+        ("models.student_import.import_students_csv",
+         lambda: student_import.import_students_csv(csv_batch()), 2),
+
+        # user
+        ("models.user.get_user_by_email", lambda: user.get_user_by_email(f.student_email), None),
+        ("models.user.get_user_by_id", lambda: user.get_user_by_id(f.student_user_id), None),
+        ("models.user.get_identity", lambda: user.get_identity(f.student_user_id), None),
+        ("models.user.invalidate_identity", lambda: user.invalidate_identity(f.student_user_id), None),
+        ("models.user.set_user_active", lambda: user.set_user_active(f.student_user_id, True), WRITE_RUNS),
+        ("models.user.record_login", lambda: user.record_login(f.student_user_id), WRITE_RUNS),
+        ("models.user.create_user", lambda: user.create_user(*unique_user(), "x", "student"), WRITE_RUNS),
+        ("models.user.register_user", lambda: user.register_user(*unique_user(), "Bench@1234", "student"), 2),
+    ]
+
+
+def route_cases(f):
+    """(name, user_id or None, role, path) for each dashboard page."""
+    return [
+        ("GET /", None, None, "/"),
+        ("GET /admin", f.admin_user_id, "admin", "/admin"),
+        ("GET /admin/diagnostics", f.admin_user_id, "admin", "/admin/diagnostics"),
+        ("GET /company/dashboard", f.company_user_id, "company", "/company/dashboard"),
+        ("GET /company/post-job", f.company_user_id, "company", "/company/post-job"),
+        ("GET /company/applicants/<id>", f.company_user_id, "company", f"/company/applicants/{f.job_id}"),
+        ("GET /company/applicants/<id>?rank=1", f.company_user_id, "company",
+         f"/company/applicants/{f.job_id}?rank=1"),
+        ("GET /student/dashboard", f.student_user_id, "student", "/student/dashboard"),
+        ("GET /jobs", f.student_user_id, "student", "/jobs"),
+        ("GET /jobs/search?q=python", f.student_user_id, "student", "/jobs/search?q=python"),
+        ("GET /my-applications", f.student_user_id, "student", "/my-applications"),
+        ("GET /notifications", f.student_user_id, "student", "/notifications"),
+    ]
+
+
+def public_model_functions():
+    """Qualified names of every public function defined in models/*.py."""
+    import models
+
+    names = set()
+    for info in pkgutil.iter_modules(models.__path__):
+        module = importlib.import_module(f"models.{info.name}")
+        for name, obj in inspect.getmembers(module, inspect.isfunction):
+            if obj.__module__ == module.__name__ and not name.startswith("_"):
+                names.add(f"{module.__name__}.{name}")
+    return names
+
+
+def measure(fn, runs):
+    """First (cold) call, then `runs` timed calls. Times in milliseconds."""
+    start = time.perf_counter()
+    fn()
+    first = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "first_ms": round(first, 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 3),
+        "min_ms": round(timings[0], 3),
+        "runs": runs,
+    }
+
+
+def run_models(app, fixtures, repeat, only=None):
+    results = {}
+    for name, fn, runs in model_cases(fixtures):
+        if only and only not in name:
+            continue
+
+        def call(fn=fn):
+            # Like a request: one pooled connection, released at the end
+            with app.app_context():
+                return fn()
+        try:
+            results[name] = measure(call, min(repeat, runs or repeat))
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"{name:<60} {results[name].get('median_ms', results[name].get('error'))}", file=sys.stderr)
+    return results
+
+
+def run_routes(app, fixtures, repeat, only=None):
+    """
+    Time each page. A page that answers 5xx or flashes an error (the views
+    catch their own exceptions and render zeros) is reported under 'errors'.
+    """
+    from flask import message_flashed
+
+    results = {}
+    for name, user_id, role, path in route_cases(fixtures):
+        if only and only not in name:
+            continue
+        client = app.test_client()
+        if user_id is not None:
+            with client.session_transaction() as session:
+                session["user_id"] = user_id
+                session["role"] = role
+        statuses, errors = set(), set()
+
+        def record_flash(sender, message, category, errors=errors):
+            if category == "error":
+                errors.add(message)
+
+        def call(client=client, path=path, statuses=statuses):
+            statuses.add(client.get(path).status_code)
+
+        with message_flashed.connected_to(record_flash, app):
+            results[name] = measure(call, repeat)
+        errors.update(f"HTTP {status}" for status in statuses if status >= 500)
+        results[name]["status"] = sorted(statuses)
+        if errors:
+            results[name]["errors"] = sorted(errors)
+        print(f"{name:<60} {results[name]['median_ms']} {sorted(statuses)} {sorted(errors) or ''}",
+              file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Per-case change against a baseline report, and the names that regressed."""
+    cases, regressions = {}, []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if "median_ms" not in result or result.get("errors"):
+            cases[name] = {"status": "error"}
+            continue
+        if not base or "median_ms" not in base:
+            cases[name] = {"status": "new", "median_ms": result["median_ms"]}
+            continue
+
+        change = result["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        delta = result["median_ms"] - base["median_ms"]
+        if change > threshold and delta > NOISE_MS:
+            status = "regressed"
+            regressions.append(name)
+        elif change < -threshold and -delta > NOISE_MS:
+            status = "improved"
+        else:
+            status = "unchanged"
+        cases[name] = {"status": status, "baseline_ms": base["median_ms"],
+                       "median_ms": result["median_ms"], "change": round(change, 4)}
+    for name in baseline.get("results", {}):
+        if name not in results:
+            cases[name] = {"status": "missing"}
+    return cases, regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per read case")
+    parser.add_argument("--only", default=None, help="run cases whose name contains this text")
+    parser.add_argument("--skip-routes", action="store_true")
+    parser.add_argument("--skip-models", action="store_true")
+    parser.add_argument("--response-cache", action="store_true", help="keep the rendered-page cache on")
+    parser.add_argument("--output", default=None, help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="compare with this stored report")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown that counts as a regression (default 0.2)")
+    parser.add_argument("--save-baseline", default=None, help="also write the report here as a baseline")
+    args = parser.parse_args()
+
+    if not args.response_cache:
+        os.environ.setdefault("RESPONSE_CACHE_ENDPOINTS", "")
+    # Sweeps are timed as a case; a background sweep would skew other cases
+    os.environ.setdefault("JOB_SWEEP_INTERVAL", "0")
+
+    from app import app
+    from db import get_db_connection
+
+    conn = get_db_connection()
+    fixtures = Fixtures(conn)
+    conn.close()
+
+    results = {}
+    if not args.skip_models:
+        results.update(run_models(app, fixtures, args.repeat, args.only))
+    if not args.skip_routes:
+        results.update(run_routes(app, fixtures, args.repeat, args.only))
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "volumes": fixtures.volumes,
+        },
+        "results": results,
+        "uncovered": sorted(public_model_functions() - set(results) - set(SKIPPED)) if not args.only else [],
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        cases, regressions = compare(results, baseline, args.threshold)
+        report["comparison"] = {
+            "baseline": args.baseline,
+            "baseline_commit": baseline.get("meta", {}).get("git_commit"),
+            "threshold": args.threshold,
+            "cases": cases,
+            "regressions": regressions,
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    if report["uncovered"]:
+        print(f"no benchmark case for: {', '.join(report['uncovered'])}", file=sys.stderr)
+    failed = sorted(name for name, result in results.items() if result.get("errors"))
+    for name in failed:
+        print(f"{name} failed: {'; '.join(results[name]['errors'])}", file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
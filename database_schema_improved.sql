@@ -122,6 +122,7 @@ CREATE TABLE IF NOT EXISTS jobs (
     INDEX idx_created_at (created_at),
     INDEX idx_application_deadline (application_deadline),
     INDEX idx_location (location),
+    INDEX idx_status_created_id (status, created_at, id),  -- keyset pagination of the job board
     FULLTEXT INDEX idx_title_description (title, description)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
@@ -149,7 +150,8 @@ CREATE TABLE IF NOT EXISTS applications (
     INDEX idx_job_id (job_id),
     INDEX idx_status (status),
     INDEX idx_applied_at (applied_at),
-    INDEX idx_reviewed_at (reviewed_at)
+    INDEX idx_reviewed_at (reviewed_at),
+    INDEX idx_job_status (job_id, status)  -- covers per-job applicant counts by status
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- =====================================================
@@ -169,6 +171,7 @@ CREATE TABLE IF NOT EXISTS notifications (
     
     INDEX idx_user_id (user_id),
     INDEX idx_is_read (is_read),
+    INDEX idx_user_read (user_id, is_read),
     INDEX idx_created_at (created_at),
     INDEX idx_type (type)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -195,18 +198,33 @@ CREATE TABLE IF NOT EXISTS activity_logs (
     INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- =====================================================
+-- CACHE VERSIONS (bumped when job listings change, so every
+-- app process can tell its cached pages are stale)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO cache_versions (name, version) VALUES ('jobs', UNIX_TIMESTAMP()), ('users', UNIX_TIMESTAMP());
+
 -- =====================================================
 -- TRIGGERS FOR AUTOMATIC UPDATES
 -- =====================================================
 
--- Trigger to update application count when new application is created
+-- Trigger to update application count when new application is created,
+-- closing the job as soon as it reaches max_applications. MySQL assigns left
+-- to right, so the status check sees the incremented count.
 DELIMITER //
 CREATE TRIGGER update_job_application_count_insert
 AFTER INSERT ON applications
 FOR EACH ROW
 BEGIN
     UPDATE jobs 
-    SET current_applications = current_applications + 1 
+    SET current_applications = current_applications + 1,
+        status = IF(status = 'active' AND max_applications IS NOT NULL
+                    AND current_applications >= max_applications, 'closed', status)
     WHERE id = NEW.job_id;
 END//
 
@@ -226,7 +244,9 @@ DELIMITER ;
 -- VIEWS FOR COMMON QUERIES (Performance Optimization)
 -- =====================================================
 
--- View for active jobs with company details
+-- View for active jobs with company details. Full and expired jobs are
+-- closed as they happen (the insert trigger above and the application's
+-- expiry sweeper), so status alone decides visibility.
 CREATE OR REPLACE VIEW vw_active_jobs AS
 SELECT 
     j.id,
@@ -248,9 +268,7 @@ SELECT
     c.logo_url
 FROM jobs j
 INNER JOIN companies c ON j.company_id = c.id
-WHERE j.status = 'active'
-AND (j.application_deadline IS NULL OR j.application_deadline >= CURDATE())
-AND (j.max_applications IS NULL OR j.current_applications < j.max_applications);
+WHERE j.status = 'active';
 
 -- View for student applications with job details
 CREATE OR REPLACE VIEW vw_student_applications AS
@@ -1,8 +1,475 @@
+"""
+Database connection handling.
+
+Model functions call get_db_connection() for the primary, or
+get_read_connection() for read-only queries that may be served by a replica.
+Connections come from shared pools instead of being opened per call, and
+inside a Flask request the same connection is handed out to every caller and
+returned to the pool when the request ends (see release_request_connection).
+
+Replicas are listed in DB_REPLICA_HOSTS ("host:port,host:port"). Reads go to
+the primary instead when no replica is healthy (lag above DB_REPLICA_MAX_LAG
+seconds, replication stopped, or unreachable), and for DB_READ_YOUR_WRITES
+seconds after the session last committed a write, so users see their own
+changes immediately.
+"""
+import os
+import threading
+import time
+from collections import deque
+
 import mysql.connector
+from flask import g, has_app_context, has_request_context, session
+from mysql.connector import errorcode
+
+from profiler import profile_cursor
+
+DB_CONFIG = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "user": os.environ.get("DB_USER", "root"),
+    "password": os.environ.get("DB_PASSWORD", "Ajay@1906"),
+    "database": os.environ.get("DB_NAME", "placement_db"),
+}
+
+# Pool settings - tune these for placement-drive peaks using get_pool_stats()
+POOL_CONFIG = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),          # idle connections kept open
+    "max_overflow": int(os.environ.get("DB_POOL_MAX_OVERFLOW", 10)),  # extra connections under load
+    "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),   # seconds to wait for a connection
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 3600)),   # reopen connections older than this
+    "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",  # check liveness before reuse
+}
+
+# Read replicas - empty means every query goes to the primary
+DB_REPLICA_HOSTS = [h.strip() for h in os.environ.get("DB_REPLICA_HOSTS", "").split(",") if h.strip()]
+DB_REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))              # seconds
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", 5))
+DB_READ_YOUR_WRITES = float(os.environ.get("DB_READ_YOUR_WRITES", 5))            # seconds
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within pool_timeout."""
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a mysql.connector connection.
+
+    close() hands the connection back to the pool instead of closing the
+    socket. Request-scoped connections ignore close() entirely; they are
+    released once in release_request_connection().
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = time.monotonic()
+        self._request_scoped = False
+        self._checked_out = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        # Statements run while handling a request are recorded by the profiler
+        return profile_cursor(self._raw.cursor(*args, **kwargs))
+
+    def commit(self):
+        self._raw.commit()
+        if self._pool is _pool:
+            _note_write()
+
+    def close(self):
+        if self._request_scoped or not self._checked_out:
+            return
+        self._pool.release(self)
+
+
+class ConnectionPool:
+    def __init__(self, db_config, pool_size=10, max_overflow=10, pool_timeout=30,
+                 pool_recycle=3600, pool_pre_ping=True, name="primary"):
+        self.name = name
+        self.db_config = dict(db_config)
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "checkouts": 0,
+            "checked_out": 0,
+            "peak_checked_out": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "pre_ping_failures": 0,
+            "timeouts": 0,
+            "waits": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0,
+        }
+
+    def _count(self, key):
+        # Called outside the lock from the network paths; += is not atomic
+        with self._cond:
+            self._stats[key] += 1
+
+    def _create(self):
+        # consume_results lets several models share one connection without
+        # tripping over a cursor that was closed before reading every row.
+        raw = mysql.connector.connect(consume_results=True, **self.db_config)
+        self._count("connections_created")
+        return PooledConnection(self, raw)
+
+    def _discard(self, conn):
+        try:
+            conn._raw.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, conn):
+        if self.pool_recycle and time.monotonic() - conn._created_at > self.pool_recycle:
+            self._count("connections_recycled")
+            return False
+        if self.pool_pre_ping:
+            try:
+                conn._raw.ping(reconnect=False)
+            except Exception:
+                self._count("pre_ping_failures")
+                return False
+        return True
+
+    def acquire(self):
+        """Borrow a connection, waiting up to pool_timeout if the pool is exhausted."""
+        start = time.monotonic()
+        waited = False
+
+        while True:
+            with self._cond:
+                if self._idle:
+                    conn = self._idle.pop()
+                    create = False
+                elif self._open < self.pool_size + self.max_overflow:
+                    self._open += 1
+                    conn = None
+                    create = True
+                else:
+                    remaining = self.pool_timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available within {self.pool_timeout}s "
+                            f"({self._open} open, pool_size={self.pool_size}, "
+                            f"max_overflow={self.max_overflow})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                    continue
+
+            # Network work happens outside the lock
+            if create:
+                try:
+                    conn = self._create()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(conn):
+                self._discard(conn)
+                try:
+                    conn = self._create()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            break
+
+        wait_time = time.monotonic() - start
+        with self._cond:
+            conn._checked_out = True
+            self._stats["checkouts"] += 1
+            self._stats["checked_out"] += 1
+            self._stats["peak_checked_out"] = max(self._stats["peak_checked_out"],
+                                                  self._stats["checked_out"])
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["total_wait_time"] += wait_time
+            self._stats["max_wait_time"] = max(self._stats["max_wait_time"], wait_time)
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding it if it is broken or surplus."""
+        conn._checked_out = False
+        conn._request_scoped = False
+
+        # Never hand out a connection with an open transaction or snapshot
+        keep = True
+        try:
+            conn._raw.rollback()
+        except Exception:
+            keep = False
+
+        with self._cond:
+            self._stats["checked_out"] -= 1
+            if keep and len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+            else:
+                self._open -= 1
+                self._discard(conn)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["open"] = self._open
+            stats["overflow"] = max(self._open - self.pool_size, 0)
+        stats["name"] = self.name
+        stats["pool_size"] = self.pool_size
+        stats["max_overflow"] = self.max_overflow
+        stats["avg_wait_time"] = (
+            stats["total_wait_time"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        )
+        return stats
+
+
+_pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+
+
+class Replica:
+    """A replica's pool plus its last measured replication lag."""
+
+    def __init__(self, host):
+        hostname, _, port = host.partition(":")
+        config = dict(DB_CONFIG, host=hostname, port=int(port or 3306))
+        self.pool = ConnectionPool(config, name=f"replica {host}", **POOL_CONFIG)
+        self.host = host
+        self.lag = None          # seconds behind the primary, None if unknown
+        self.healthy = True
+        self.error = None
+        self.checked_at = None
+        self._check_lock = threading.Lock()
+
+    def _measure_lag(self):
+        conn = self.pool.acquire()
+        try:
+            cur = conn._raw.cursor(dictionary=True)
+            try:
+                cur.execute("SHOW REPLICA STATUS")
+            except mysql.connector.Error:
+                cur.execute("SHOW SLAVE STATUS")  # MySQL before 8.0.22
+            status = cur.fetchone()
+            cur.close()
+        finally:
+            conn.close()
+        if not status:
+            raise RuntimeError("replication is not configured")
+        lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+        if lag is None:
+            raise RuntimeError("replication is stopped")
+        return float(lag)
+
+    def check(self):
+        """Re-measure lag if the last check is older than DB_REPLICA_LAG_CHECK_INTERVAL."""
+        if self.checked_at is not None and time.monotonic() - self.checked_at < DB_REPLICA_LAG_CHECK_INTERVAL:
+            return self.healthy
+        # One thread measures; the others use the previous result
+        if not self._check_lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            try:
+                self.lag = self._measure_lag()
+                self.error = None
+                self.healthy = self.lag <= DB_REPLICA_MAX_LAG
+            except Exception as e:
+                self.lag = None
+                self.error = str(e)
+                self.healthy = False
+            self.checked_at = time.monotonic()
+        finally:
+            self._check_lock.release()
+        return self.healthy
+
+    def stats(self):
+        return {
+            "host": self.host,
+            "healthy": self.healthy,
+            "lag": self.lag,
+            "error": self.error,
+            "checked_ago": None if self.checked_at is None else round(time.monotonic() - self.checked_at, 1),
+            "pool": self.pool.stats(),
+        }
+
+
+_replicas = [Replica(host) for host in DB_REPLICA_HOSTS]
+_next_replica = 0
+_routing_lock = threading.Lock()
+_routing = {
+    "replica": 0,            # reads served by a replica
+    "primary_no_replicas": 0,
+    "primary_recent_write": 0,  # read-your-writes window
+    "primary_unhealthy": 0,  # every replica lagging or down
+    "writes": 0,             # commits on the primary
+}
+
+
+def _count_route(key):
+    with _routing_lock:
+        _routing[key] += 1
+
+
+def _note_write():
+    _count_route("writes")
+    if has_app_context():
+        g.db_wrote = True
+    if has_request_context():
+        session["db_last_write"] = time.time()
+
+
+def _recently_wrote():
+    if has_app_context() and g.get("db_wrote"):
+        return True
+    if not has_request_context():
+        return False
+    last_write = session.get("db_last_write")
+    return last_write is not None and time.time() - last_write < DB_READ_YOUR_WRITES
+
+
+def _acquire_replica():
+    """A connection from the next healthy replica, or None."""
+    global _next_replica
+    with _routing_lock:
+        start = _next_replica
+        _next_replica = (_next_replica + 1) % len(_replicas)
+    for i in range(len(_replicas)):
+        replica = _replicas[(start + i) % len(_replicas)]
+        if not replica.check():
+            continue
+        try:
+            return replica.pool.acquire()
+        except Exception as e:
+            replica.healthy = False
+            replica.error = str(e)
+    return None
+
+
+def reads_need_primary():
+    """True when reads in this context must see its own recent writes."""
+    return _recently_wrote()
+
+
+def pin_reads_to_primary():
+    """Send the rest of this app context's reads to the primary."""
+    g.db_wrote = True
+
+
 def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="Ajay@1906",
-        database="placement_db"
-    )
+    """
+    Get a connection to the primary.
+
+    Inside a request every call returns the same pooled connection, so the
+    models on one page share a single handshake. Outside a request (scripts,
+    background threads) each call borrows its own connection and close()
+    returns it to the pool.
+    """
+    if has_app_context():
+        conn = g.get("db_conn")
+        if conn is None:
+            conn = _pool.acquire()
+            conn._request_scoped = True
+            g.db_conn = conn
+        return conn
+
+    return _pool.acquire()
+
+
+def get_read_connection():
+    """
+    Get a connection for read-only queries: a replica when one is healthy and
+    the session has not written recently, otherwise the primary. Request
+    scoping works as in get_db_connection().
+    """
+    if not _replicas:
+        _count_route("primary_no_replicas")
+        return get_db_connection()
+    if _recently_wrote():
+        _count_route("primary_recent_write")
+        return get_db_connection()
+
+    if has_app_context():
+        conn = g.get("db_read_conn")
+        if conn is not None:
+            _count_route("replica")
+            return conn
+
+    conn = _acquire_replica()
+    if conn is None:
+        _count_route("primary_unhealthy")
+        return get_db_connection()
+
+    _count_route("replica")
+    if has_app_context():
+        conn._request_scoped = True
+        g.db_read_conn = conn
+    return conn
+
+
+def release_request_connection(exception=None):
+    """Teardown handler: return the request's connections to their pools."""
+    for key in ("db_conn", "db_read_conn"):
+        conn = g.pop(key, None)
+        if conn is not None:
+            conn._pool.release(conn)
+
+
+# -------------------- SHARED CACHE VERSIONS --------------------
+# Rows of cache_versions are bumped in the transaction that changes the data
+# behind an in-process cache; other processes poll them to know when to drop
+# their copies.
+
+def bump_cache_version(cur, name):
+    """Bump a shared cache version in the caller's transaction, before it commits."""
+    try:
+        cur.execute(
+            "UPDATE cache_versions SET version = GREATEST(version + 1, UNIX_TIMESTAMP()) WHERE name = %s",
+            (name,)
+        )
+    except mysql.connector.Error as e:
+        # Not migrated yet: other processes catch up when their caches expire
+        if e.errno != errorcode.ER_NO_SUCH_TABLE:
+            raise
+
+
+def read_cache_version(name):
+    """The current shared version, or None if the row does not exist."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+        row = cur.fetchone()
+    finally:
+        cur.close()
+        conn.close()
+    return row[0] if row else None
+
+
+def get_pool_stats():
+    return _pool.stats()
+
+
+def get_routing_stats():
+    """Read routing counters and each replica's lag, health and pool stats."""
+    with _routing_lock:
+        routing = dict(_routing)
+    return {
+        "routing": routing,
+        "read_your_writes_window": DB_READ_YOUR_WRITES,
+        "max_lag": DB_REPLICA_MAX_LAG,
+        "replicas": [replica.stats() for replica in _replicas],
+    }
@@ -0,0 +1,34 @@
+"""
+Bulk Student Import
+Onboards students from a CSV file (see models/student_import.py for columns).
+
+Usage:
+    python import_students.py students.csv [--batch-size 500]
+"""
+
+import argparse
+import time
+
+from models.student_import import import_students_csv, IMPORT_BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import students from a CSV file")
+    parser.add_argument("csv_file")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"Importing students from {args.csv_file}...")
+    start = time.perf_counter()
+    with open(args.csv_file, newline="", encoding="utf-8-sig") as f:
+        report = import_students_csv(f, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    for line, message in report["errors"]:
+        print(f"   ⚠ line {line}: {message}")
+    print(f"\n✅ Imported {report['imported']} of {report['rows']} rows "
+          f"in {elapsed:.1f}s ({len(report['errors'])} skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,60 @@
 """
 Database Migration Script
-This script helps migrate from the old schema to the improved schema.
+Brings an existing database up to the improved schema.
 Run this script after backing up your database.
+
+Migrations are numbered versions (MIGRATIONS below). Applied versions are
+recorded in schema_migrations with their duration and the statements they
+ran, so each version runs once. Before pending versions run, the current
+schema is read from information_schema in one query, and only the changes
+that are actually missing are made:
+    - a version's new columns, indexes, checks and column changes for a
+      table go into one ALTER TABLE, so a large table is rebuilt at most once
+    - each ALTER asks for ALGORITHM=INSTANT, then INPLACE with LOCK=NONE, and
+      falls back to MySQL's default (a table copy) only when neither is allowed
+    - tables and triggers are created only if missing or different
+A version that fails part way is not recorded; running the script again
+skips whatever it had already changed.
+
+    python migrate_database.py             # apply pending versions (asks first)
+    python migrate_database.py --dry-run   # print what would run
+    python migrate_database.py --status    # list applied and pending versions
 """
 
+import argparse
+import re
+import time
+
 import mysql.connector
+from mysql.connector import errorcode
+
 from db import get_db_connection
 
-def migrate_database():
-    """Migrate database to improved schema"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    print("Starting database migration...")
-    
-    try:
-        # Add new columns to users table
-        print("1. Updating users table...")
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN is_active BOOLEAN DEFAULT TRUE")
-            print("   ✓ Added is_active column")
-        except mysql.connector.Error as e:
-            if "Duplicate column name" not in str(e):
-                print(f"   ⚠ is_active: {e}")
-        
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN email_verified BOOLEAN DEFAULT FALSE")
-            print("   ✓ Added email_verified column")
-        except mysql.connector.Error as e:
-            if "Duplicate column name" not in str(e):
-                print(f"   ⚠ email_verified: {e}")
-        
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN last_login TIMESTAMP NULL")
-            print("   ✓ Added last_login column")
-        except mysql.connector.Error as e:
-            if "Duplicate column name" not in str(e):
-                print(f"   ⚠ last_login: {e}")
-        
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
-            print("   ✓ Added updated_at column")
-        except mysql.connector.Error as e:
-            if "Duplicate column name" not in str(e):
-                print(f"   ⚠ updated_at: {e}")
-        
-        # Add indexes to users table
-        try:
-            cursor.execute("CREATE INDEX idx_email ON users(email)")
-            print("   ✓ Added email index")
-        except mysql.connector.Error as e:
-            if "Duplicate key name" not in str(e):
-                print(f"   ⚠ idx_email: {e}")
-        
-        # Add new columns to students table
-        print("\n2. Updating students table...")
-        new_student_columns = [
+# Each version may have, applied in this order:
+#   tables     {table: CREATE TABLE statement}, run if the table is missing
+#   columns    {table: [(column, definition)]}, added if missing
+#   modify     {table: [(column, definition)]}, run if the column's type differs
+#   indexes    {table: [(index, "(columns)")]}, added if missing
+#   unique     {table: [(key, "(columns)")]}, added unless a unique index on exactly those columns exists
+#   checks     {table: [(constraint, expression)]}, added if missing
+#   triggers   {trigger: CREATE TRIGGER statement}, (re)created if missing or different
+#   statements [SQL], data changes run when the version is applied
+MIGRATIONS = [
+    {
+        "version": 1,
+        "name": "users: status, verification and login columns",
+        "columns": {"users": [
+            ("is_active", "BOOLEAN DEFAULT TRUE"),
+            ("email_verified", "BOOLEAN DEFAULT FALSE"),
+            ("last_login", "TIMESTAMP NULL"),
+            ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        ]},
+        "indexes": {"users": [("idx_email", "(email)")]},
+    },
+    {
+        "version": 2,
+        "name": "students: profile columns and CGPA check",
+        "columns": {"students": [
             ("phone", "VARCHAR(20)"),
             ("year_of_study", "INT"),
             ("skills", "TEXT"),
@@ -64,28 +63,14 @@ def migrate_database():
             ("github_url", "VARCHAR(500)"),
             ("bio", "TEXT"),
             ("is_profile_complete", "BOOLEAN DEFAULT FALSE"),
-            ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
-        ]
-        
-        for col_name, col_type in new_student_columns:
-            try:
-                cursor.execute(f"ALTER TABLE students ADD COLUMN {col_name} {col_type}")
-                print(f"   ✓ Added {col_name} column")
-            except mysql.connector.Error as e:
-                if "Duplicate column name" not in str(e):
-                    print(f"   ⚠ {col_name}: {e}")
-        
-        # Add CGPA constraint
-        try:
-            cursor.execute("ALTER TABLE students ADD CONSTRAINT chk_cgpa CHECK (cgpa >= 0 AND cgpa <= 10)")
-            print("   ✓ Added CGPA constraint")
-        except mysql.connector.Error as e:
-            if "Duplicate" not in str(e):
-                print(f"   ⚠ CGPA constraint: {e}")
-        
-        # Add new columns to companies table
-        print("\n3. Updating companies table...")
-        new_company_columns = [
+            ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        ]},
+        "checks": {"students": [("chk_cgpa", "cgpa >= 0 AND cgpa <= 10")]},
+    },
+    {
+        "version": 3,
+        "name": "companies: profile columns",
+        "columns": {"companies": [
             ("company_type", "VARCHAR(100)"),
             ("industry", "VARCHAR(100)"),
             ("website", "VARCHAR(500)"),
@@ -94,20 +79,13 @@ def migrate_database():
             ("description", "TEXT"),
             ("logo_url", "VARCHAR(500)"),
             ("is_verified", "BOOLEAN DEFAULT FALSE"),
-            ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
-        ]
-        
-        for col_name, col_type in new_company_columns:
-            try:
-                cursor.execute(f"ALTER TABLE companies ADD COLUMN {col_name} {col_type}")
-                print(f"   ✓ Added {col_name} column")
-            except mysql.connector.Error as e:
-                if "Duplicate column name" not in str(e):
-                    print(f"   ⚠ {col_name}: {e}")
-        
-        # Add new columns to jobs table
-        print("\n4. Updating jobs table...")
-        new_job_columns = [
+            ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        ]},
+    },
+    {
+        "version": 4,
+        "name": "jobs: listing columns, status enum, keyset pagination index",
+        "columns": {"jobs": [
             ("requirements", "TEXT"),
             ("location", "VARCHAR(255)"),
             ("job_type", "ENUM('full-time', 'part-time', 'internship', 'contract') DEFAULT 'full-time'"),
@@ -118,131 +96,394 @@ def migrate_database():
             ("max_applications", "INT DEFAULT 100"),
             ("current_applications", "INT DEFAULT 0"),
             ("views_count", "INT DEFAULT 0"),
-            ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
-        ]
-        
-        for col_name, col_type in new_job_columns:
-            try:
-                cursor.execute(f"ALTER TABLE jobs ADD COLUMN {col_name} {col_type}")
-                print(f"   ✓ Added {col_name} column")
-            except mysql.connector.Error as e:
-                if "Duplicate column name" not in str(e):
-                    print(f"   ⚠ {col_name}: {e}")
-        
-        # Update jobs status enum
-        try:
-            cursor.execute("ALTER TABLE jobs MODIFY COLUMN status ENUM('active', 'inactive', 'closed', 'draft') DEFAULT 'active'")
-            print("   ✓ Updated status enum")
-        except mysql.connector.Error as e:
-            print(f"   ⚠ status enum: {e}")
-        
-        # Add new columns to applications table
-        print("\n5. Updating applications table...")
-        new_application_columns = [
+            ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+        ]},
+        "modify": {"jobs": [
+            ("status", "ENUM('active', 'inactive', 'closed', 'draft') DEFAULT 'active'"),
+        ]},
+        "indexes": {"jobs": [("idx_status_created_id", "(status, created_at, id)")]},
+    },
+    {
+        "version": 5,
+        "name": "applications: review columns, status enum, job/status index",
+        "columns": {"applications": [
             ("cover_letter", "TEXT"),
             ("reviewed_at", "TIMESTAMP NULL"),
-            ("notes", "TEXT")
-        ]
-        
-        for col_name, col_type in new_application_columns:
-            try:
-                cursor.execute(f"ALTER TABLE applications ADD COLUMN {col_name} {col_type}")
-                print(f"   ✓ Added {col_name} column")
-            except mysql.connector.Error as e:
-                if "Duplicate column name" not in str(e):
-                    print(f"   ⚠ {col_name}: {e}")
-        
-        # Update applications status enum
-        try:
-            cursor.execute("ALTER TABLE applications MODIFY COLUMN status ENUM('pending', 'reviewed', 'shortlisted', 'accepted', 'rejected', 'withdrawn') DEFAULT 'pending'")
-            print("   ✓ Updated status enum")
-        except mysql.connector.Error as e:
-            print(f"   ⚠ status enum: {e}")
-        
-        # Create notifications table
-        print("\n6. Creating notifications table...")
-        try:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS notifications (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    user_id INT NOT NULL,
-                    type VARCHAR(50) NOT NULL,
-                    title VARCHAR(255) NOT NULL,
-                    message TEXT NOT NULL,
-                    link VARCHAR(500),
-                    is_read BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                    INDEX idx_user_id (user_id),
-                    INDEX idx_is_read (is_read),
-                    INDEX idx_created_at (created_at),
-                    INDEX idx_type (type)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """)
-            print("   ✓ Created notifications table")
-        except mysql.connector.Error as e:
-            if "already exists" not in str(e).lower():
-                print(f"   ⚠ notifications table: {e}")
-        
-        # Create activity_logs table
-        print("\n7. Creating activity_logs table...")
-        try:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS activity_logs (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    user_id INT,
-                    action VARCHAR(100) NOT NULL,
-                    entity_type VARCHAR(50),
-                    entity_id INT,
-                    details TEXT,
-                    ip_address VARCHAR(45),
-                    user_agent TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL,
-                    INDEX idx_user_id (user_id),
-                    INDEX idx_action (action),
-                    INDEX idx_entity (entity_type, entity_id),
-                    INDEX idx_created_at (created_at)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """)
-            print("   ✓ Created activity_logs table")
-        except mysql.connector.Error as e:
-            if "already exists" not in str(e).lower():
-                print(f"   ⚠ activity_logs table: {e}")
-        
-        # Update existing records
-        print("\n8. Updating existing records...")
-        try:
-            # Mark existing students with complete profiles
-            cursor.execute("""
-                UPDATE students 
-                SET is_profile_complete = TRUE 
-                WHERE name IS NOT NULL AND name != '' 
-                AND email IS NOT NULL AND email != ''
-                AND course IS NOT NULL AND course != ''
-                AND cgpa > 0
-            """)
-            print(f"   ✓ Updated {cursor.rowcount} student profiles")
-        except mysql.connector.Error as e:
-            print(f"   ⚠ Update students: {e}")
-        
-        # Initialize current_applications count
+            ("notes", "TEXT"),
+        ]},
+        "modify": {"applications": [
+            ("status", "ENUM('pending', 'reviewed', 'shortlisted', 'accepted', 'rejected', 'withdrawn') "
+                       "DEFAULT 'pending'"),
+        ]},
+        "indexes": {"applications": [("idx_job_status", "(job_id, status)")]},
+    },
+    {
+        "version": 6,
+        "name": "notifications table",
+        "tables": {"notifications": """
+            CREATE TABLE notifications (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NOT NULL,
+                type VARCHAR(50) NOT NULL,
+                title VARCHAR(255) NOT NULL,
+                message TEXT NOT NULL,
+                link VARCHAR(500),
+                is_read BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                INDEX idx_user_id (user_id),
+                INDEX idx_is_read (is_read),
+                INDEX idx_user_read (user_id, is_read),
+                INDEX idx_created_at (created_at),
+                INDEX idx_type (type)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """},
+        "indexes": {"notifications": [("idx_user_read", "(user_id, is_read)")]},
+    },
+    {
+        "version": 7,
+        "name": "activity_logs table",
+        "tables": {"activity_logs": """
+            CREATE TABLE activity_logs (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT,
+                action VARCHAR(100) NOT NULL,
+                entity_type VARCHAR(50),
+                entity_id INT,
+                details TEXT,
+                ip_address VARCHAR(45),
+                user_agent TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL,
+                INDEX idx_user_id (user_id),
+                INDEX idx_action (action),
+                INDEX idx_entity (entity_type, entity_id),
+                INDEX idx_created_at (created_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """},
+    },
+    {
+        "version": 8,
+        "name": "backfill profile completeness and application counts",
+        "statements": [
+            """
+            UPDATE students
+            SET is_profile_complete = TRUE
+            WHERE name IS NOT NULL AND name != ''
+            AND email IS NOT NULL AND email != ''
+            AND course IS NOT NULL AND course != ''
+            AND cgpa > 0
+            """,
+            """
+            UPDATE jobs j
+            LEFT JOIN (
+                SELECT job_id, COUNT(*) AS applications FROM applications GROUP BY job_id
+            ) a ON a.job_id = j.id
+            SET j.current_applications = COALESCE(a.applications, 0)
+            """,
+        ],
+    },
+    {
+        "version": 9,
+        "name": "close jobs in the application insert trigger when they fill",
+        "triggers": {"update_job_application_count_insert": """
+            CREATE TRIGGER update_job_application_count_insert
+            AFTER INSERT ON applications
+            FOR EACH ROW
+            BEGIN
+                UPDATE jobs
+                SET current_applications = current_applications + 1,
+                    status = IF(status = 'active' AND max_applications IS NOT NULL
+                                AND current_applications >= max_applications, 'closed', status)
+                WHERE id = NEW.job_id;
+            END
+        """},
+    },
+    {
+        "version": 10,
+        "name": "unique user_id on students and companies (profile upserts)",
+        # Named as in database_schema_improved.sql. Fails if a user already
+        # has two profiles; remove the duplicates and run again.
+        "unique": {
+            "students": [("user_id", "(user_id)")],
+            "companies": [("user_id", "(user_id)")],
+        },
+    },
+    {
+        "version": 11,
+        "name": "cache_versions: job listing changes shared between app processes",
+        "tables": {"cache_versions": """
+            CREATE TABLE cache_versions (
+                name VARCHAR(64) PRIMARY KEY,
+                version BIGINT NOT NULL
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """},
+        "statements": [
+            "INSERT IGNORE INTO cache_versions (name, version) VALUES ('jobs', UNIX_TIMESTAMP())",
+        ],
+    },
+    {
+        "version": 12,
+        "name": "cache_versions: account status changes shared between app processes",
+        "statements": [
+            "INSERT IGNORE INTO cache_versions (name, version) VALUES ('users', UNIX_TIMESTAMP())",
+        ],
+    },
+]
+
+SCHEMA_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_ms INT NOT NULL,
+        statements TEXT
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# Strongest first; MySQL refuses an algorithm it can't use before doing any work
+ALTER_ALGORITHMS = ("ALGORITHM=INSTANT", "ALGORITHM=INPLACE, LOCK=NONE", None)
+INSTANT_CLAUSES = ("ADD COLUMN", "MODIFY COLUMN")
+ALGORITHM_REFUSED = (
+    errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED,
+    errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED_REASON,
+    errorcode.ER_UNKNOWN_ALTER_ALGORITHM,   # INSTANT before MySQL 8.0
+)
+
+
+def _squash(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _same_type(a, b):
+    return re.sub(r"\s+", "", a).lower() == re.sub(r"\s+", "", b).lower()
+
+
+def _column_type(definition):
+    """The type in a column definition: ENUM('a', 'b') for "ENUM('a', 'b') DEFAULT 'a'"."""
+    return re.split(r"\s+(?:DEFAULT|NOT NULL|NULL|ON UPDATE)\b", definition, maxsplit=1, flags=re.I)[0]
+
+
+def _key_columns(columns):
+    """("job_id", "status") for "(job_id, status)"; prefix lengths are dropped."""
+    return tuple(re.sub(r"\(.*\)", "", column).strip() for column in columns.strip()[1:-1].split(","))
+
+
+def _trigger_body(create_sql):
+    return create_sql[create_sql.upper().index("BEGIN"):]
+
+
+def read_schema(cursor):
+    """
+    The current database's columns (with types), indexes, check constraints
+    and trigger bodies, read from information_schema in one query. Unique
+    indexes are also recorded by their columns, since only those say whether
+    a table already has the key (an FK index can carry the column's name).
+    """
+    cursor.execute(
+        """
+        SELECT 'column', TABLE_NAME, COLUMN_NAME, COLUMN_TYPE
+        FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE()
+        UNION ALL
+        SELECT IF(MIN(NON_UNIQUE) = 0, 'unique', 'index'), TABLE_NAME, INDEX_NAME,
+               GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX)
+        FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+        GROUP BY TABLE_NAME, INDEX_NAME
+        UNION ALL
+        SELECT 'check', TABLE_NAME, CONSTRAINT_NAME, NULL
+        FROM information_schema.TABLE_CONSTRAINTS
+        WHERE TABLE_SCHEMA = DATABASE() AND CONSTRAINT_TYPE = 'CHECK'
+        UNION ALL
+        SELECT 'trigger', EVENT_OBJECT_TABLE, TRIGGER_NAME, ACTION_STATEMENT
+        FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()
+        """
+    )
+    schema = {"columns": {}, "indexes": {}, "unique": {}, "checks": {}, "triggers": {}}
+    for kind, table, name, detail in cursor.fetchall():
+        if kind == "column":
+            schema["columns"].setdefault(table, {})[name] = detail
+        elif kind in ("index", "unique"):
+            schema["indexes"].setdefault(table, set()).add(name)
+            if kind == "unique":
+                schema["unique"].setdefault(table, set()).add(tuple((detail or "").split(",")))
+        elif kind == "check":
+            schema["checks"].setdefault(table, set()).add(name)
+        else:
+            schema["triggers"][name] = detail
+    return schema
+
+
+def plan_migration(migration, schema):
+    """
+    The steps that bring the schema up to this version, as (kind, name, sql)
+    tuples. ALTERs are ("alter", table, [clauses]), one per table.
+    """
+    steps = []
+    created = set()
+
+    for table, create_sql in migration.get("tables", {}).items():
+        if table not in schema["columns"]:
+            steps.append(("create", table, create_sql))
+            created.add(table)
+
+    alters = {}
+    for table, columns in migration.get("columns", {}).items():
+        existing = schema["columns"].get(table, {})
+        for column, definition in columns:
+            if column not in existing:
+                alters.setdefault(table, []).append(f"ADD COLUMN {column} {definition}")
+    for table, columns in migration.get("modify", {}).items():
+        existing = schema["columns"].get(table, {})
+        for column, definition in columns:
+            if column in existing and not _same_type(existing[column], _column_type(definition)):
+                alters.setdefault(table, []).append(f"MODIFY COLUMN {column} {definition}")
+    for table, indexes in migration.get("indexes", {}).items():
+        existing = schema["indexes"].get(table, set())
+        for index, columns in indexes:
+            if index not in existing:
+                alters.setdefault(table, []).append(f"ADD INDEX {index} {columns}")
+    for table, keys in migration.get("unique", {}).items():
+        existing = schema["unique"].get(table, set())
+        for key, columns in keys:
+            if _key_columns(columns) not in existing:
+                # A plain index already holding the name (e.g. the FK index on
+                # the column) is replaced in the same ALTER, so the FK is
+                # never left without an index.
+                if key in schema["indexes"].get(table, set()):
+                    alters.setdefault(table, []).append(f"DROP INDEX {key}")
+                alters.setdefault(table, []).append(f"ADD UNIQUE KEY {key} {columns}")
+    for table, checks in migration.get("checks", {}).items():
+        existing = schema["checks"].get(table, set())
+        for name, expression in checks:
+            if name not in existing:
+                alters.setdefault(table, []).append(f"ADD CONSTRAINT {name} CHECK ({expression})")
+    for table, clauses in alters.items():
+        # A table created by this version already has everything
+        if table not in created:
+            steps.append(("alter", table, clauses))
+
+    for trigger, create_sql in migration.get("triggers", {}).items():
+        current = schema["triggers"].get(trigger)
+        if current is None or _squash(current) != _squash(_trigger_body(create_sql)):
+            if current is not None:
+                steps.append(("drop_trigger", trigger, f"DROP TRIGGER IF EXISTS {trigger}"))
+            steps.append(("trigger", trigger, create_sql))
+
+    for sql in migration.get("statements", []):
+        steps.append(("statement", None, sql))
+    return steps
+
+
+def _alter(cursor, table, clauses):
+    """Run one ALTER TABLE with the strongest online algorithm MySQL accepts. Returns the SQL run."""
+    instant = all(clause.startswith(INSTANT_CLAUSES) for clause in clauses)
+    for algorithm in ALTER_ALGORITHMS:
+        if algorithm == "ALGORITHM=INSTANT" and not instant:
+            continue
+        sql = f"ALTER TABLE {table} " + ", ".join(clauses + ([algorithm] if algorithm else []))
         try:
-            cursor.execute("""
-                UPDATE jobs j
-                SET current_applications = (
-                    SELECT COUNT(*) FROM applications a WHERE a.job_id = j.id
-                )
-            """)
-            print(f"   ✓ Updated application counts for {cursor.rowcount} jobs")
+            cursor.execute(sql)
+            return sql
         except mysql.connector.Error as e:
-            print(f"   ⚠ Update application counts: {e}")
-        
-        conn.commit()
-        print("\n✅ Migration completed successfully!")
-        print("\nNote: Some indexes and constraints may need to be added manually.")
-        print("Refer to database_schema_improved.sql for complete schema.")
-        
+            if algorithm is None or e.errno not in ALGORITHM_REFUSED:
+                raise
+
+
+def _note_applied(schema, kind, name, sql):
+    """Keep the schema read at the start in step with what was just changed."""
+    if kind == "create":
+        schema["columns"][name] = {}
+        schema["indexes"][name] = set(re.findall(r"\bINDEX\s+(\w+)", sql, flags=re.I))
+    elif kind == "alter":
+        for clause in sql:
+            words = clause.split()
+            if clause.startswith(INSTANT_CLAUSES):
+                schema["columns"].setdefault(name, {})[words[2]] = _column_type(" ".join(words[3:]))
+            elif clause.startswith("ADD INDEX"):
+                schema["indexes"].setdefault(name, set()).add(words[2])
+            elif clause.startswith("ADD UNIQUE KEY"):
+                schema["indexes"].setdefault(name, set()).add(words[3])
+                schema["unique"].setdefault(name, set()).add(_key_columns(" ".join(words[4:])))
+            elif clause.startswith("ADD CONSTRAINT"):
+                schema["checks"].setdefault(name, set()).add(words[2])
+    elif kind == "trigger":
+        schema["triggers"][name] = _trigger_body(sql)
+
+
+def get_applied_versions(cursor):
+    """{version: (version, name, applied_at, duration_ms)} from schema_migrations."""
+    try:
+        cursor.execute("SELECT version, name, applied_at, duration_ms FROM schema_migrations ORDER BY version")
+    except mysql.connector.Error as e:
+        if e.errno != errorcode.ER_NO_SUCH_TABLE:
+            raise
+        return {}
+    return {row[0]: row for row in cursor.fetchall()}
+
+
+def migrate_database(dry_run=False):
+    """Apply every pending migration version. Returns the versions applied."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    applied_now = []
+
+    print("Starting database migration...")
+
+    try:
+        applied = get_applied_versions(cursor)
+        pending = [m for m in MIGRATIONS if m["version"] not in applied]
+        if not pending:
+            print("\n✅ Database is up to date.")
+            return applied_now
+
+        schema = read_schema(cursor)
+        for migration in pending:
+            print(f"\n{migration['version']}. {migration['name']}")
+            steps = plan_migration(migration, schema)
+            if not steps:
+                print("   ✓ Already in place")
+
+            started = time.perf_counter()
+            executed = []
+            for kind, name, sql in steps:
+                if dry_run:
+                    statement = f"ALTER TABLE {name} {', '.join(sql)}" if kind == "alter" else sql
+                    print(f"   would run: {_squash(statement)}")
+                    continue
+
+                step_started = time.perf_counter()
+                if kind == "alter":
+                    statement = _alter(cursor, name, sql)
+                else:
+                    statement = sql
+                    cursor.execute(sql)
+                    if kind == "statement":
+                        conn.commit()
+                _note_applied(schema, kind, name, sql)
+                executed.append(_squash(statement))
+                step_ms = (time.perf_counter() - step_started) * 1000
+                rows = f", {cursor.rowcount} rows" if kind == "statement" else ""
+                print(f"   ✓ {_squash(statement)[:100]} ({step_ms:.0f} ms{rows})")
+
+            if dry_run:
+                continue
+
+            cursor.execute(SCHEMA_MIGRATIONS_TABLE)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, duration_ms, statements) VALUES (%s, %s, %s, %s)",
+                (migration["version"], migration["name"], duration_ms, ";\n".join(executed))
+            )
+            conn.commit()
+            applied_now.append(migration["version"])
+            print(f"   Recorded version {migration['version']} ({duration_ms} ms)")
+
+        if dry_run:
+            print("\nDry run: nothing was changed.")
+        else:
+            print("\n✅ Migration completed successfully!")
+        return applied_now
+
     except Exception as e:
         conn.rollback()
         print(f"\n❌ Migration failed: {e}")
@@ -251,21 +492,46 @@ def migrate_database():
         cursor.close()
         conn.close()
 
-if __name__ == "__main__":
-    print("=" * 60)
-    print("Database Migration Tool")
-    print("=" * 60)
-    print("\n⚠️  IMPORTANT: Backup your database before running this script!")
-    print("\nThis script will:")
-    print("1. Add new columns to existing tables")
-    print("2. Create new tables (notifications, activity_logs)")
-    print("3. Update existing records")
-    print("\nPress Ctrl+C to cancel, or Enter to continue...")
-    
+
+def print_status():
+    conn = get_db_connection()
+    cursor = conn.cursor()
     try:
-        input()
-        migrate_database()
-    except KeyboardInterrupt:
-        print("\n\nMigration cancelled by user.")
-    except Exception as e:
-        print(f"\n\nError: {e}")
+        applied = get_applied_versions(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+    for migration in MIGRATIONS:
+        row = applied.get(migration["version"])
+        state = f"applied {row[2]} in {row[3]} ms" if row else "pending"
+        print(f"{migration['version']:>3}  {migration['name']:<64} {state}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending database migrations.")
+    parser.add_argument("--status", action="store_true", help="list applied and pending versions")
+    parser.add_argument("--dry-run", action="store_true", help="print the statements without running them")
+    parser.add_argument("--yes", action="store_true", help="don't ask for confirmation")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+    elif args.dry_run:
+        migrate_database(dry_run=True)
+    else:
+        print("=" * 60)
+        print("Database Migration Tool")
+        print("=" * 60)
+        print("\n⚠️  IMPORTANT: Backup your database before running this script!")
+        print("\nOnly changes missing from the database are applied (see --dry-run).")
+
+        try:
+            if not args.yes:
+                print("\nPress Ctrl+C to cancel, or Enter to continue...")
+                input()
+            migrate_database()
+        except KeyboardInterrupt:
+            print("\n\nMigration cancelled by user.")
+        except Exception as e:
+            print(f"\n\nError: {e}")
@@ -0,0 +1,154 @@
+"""
+Audit trail in the activity_logs table.
+
+log_activity() only puts the event on a bounded in-memory queue; a background
+writer drains it and inserts up to ACTIVITY_LOG_BATCH_SIZE events per
+statement, so recording an event never waits on the database. When the queue
+is full the event is dropped and counted rather than slowing the request
+down. The queue is flushed on shutdown; events still queued when the process
+dies without running it are lost.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+
+from flask import has_request_context, request, session
+
+from db import get_db_connection
+
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get("ACTIVITY_LOG_FLUSH_INTERVAL", 2))
+ACTIVITY_LOG_MAX_PENDING = int(os.environ.get("ACTIVITY_LOG_MAX_PENDING", 10000))
+ACTIVITY_LOG_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+_events = queue.Queue(maxsize=ACTIVITY_LOG_MAX_PENDING)
+_counters = {'written': 0, 'dropped': 0, 'failed': 0}
+_counters_lock = threading.Lock()
+_write_lock = threading.Lock()
+_flush_requested = threading.Event()
+_writer_thread = None
+
+
+def _count(key, n=1):
+    with _counters_lock:
+        _counters[key] += n
+
+
+def log_activity(action, entity_type=None, entity_id=None, details=None, user_id=None):
+    """
+    Record an event. Cheap and non-blocking: safe to call from any route or
+    model. Inside a request, user_id defaults to the logged-in user and the
+    client's IP address and user agent are captured. details may be a string
+    or anything JSON-serializable.
+    """
+    ip_address = user_agent = None
+    if has_request_context():
+        if user_id is None:
+            user_id = session.get("user_id")
+        ip_address = request.remote_addr
+        user_agent = request.user_agent.string[:1000] or None
+
+    if details is not None and not isinstance(details, str):
+        details = json.dumps(details, default=str)
+
+    try:
+        _events.put_nowait((user_id, action, entity_type, entity_id, details, ip_address, user_agent))
+    except queue.Full:
+        _count('dropped')
+        return
+    if _events.qsize() >= ACTIVITY_LOG_BATCH_SIZE:
+        _flush_requested.set()
+
+
+def _drain(limit):
+    batch = []
+    while len(batch) < limit:
+        try:
+            batch.append(_events.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _insert_events(batch):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"""
+            INSERT INTO activity_logs (user_id, action, entity_type, entity_id,
+                                       details, ip_address, user_agent)
+            VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(batch))}
+            """,
+            [value for event in batch for value in event]
+        )
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def flush_activity_log():
+    """
+    Write every queued event. Returns the number written. If a batch fails it
+    is counted as failed and discarded, and the error is raised; later events
+    stay queued for the next flush.
+    """
+    written = 0
+    # One writer at a time, so the shutdown flush doesn't race the thread
+    with _write_lock:
+        while True:
+            batch = _drain(ACTIVITY_LOG_BATCH_SIZE)
+            if not batch:
+                return written
+            try:
+                _insert_events(batch)
+            except Exception:
+                # Audit events are best-effort; don't retry a batch forever
+                _count('failed', len(batch))
+                raise
+            _count('written', len(batch))
+            written += len(batch)
+
+
+def get_activity_log_stats():
+    """Queued, written, dropped (queue full) and failed (insert error) event counts."""
+    with _counters_lock:
+        return {'queued': _events.qsize(), **_counters}
+
+
+def _writer_loop():
+    while True:
+        _flush_requested.wait(ACTIVITY_LOG_FLUSH_INTERVAL)
+        _flush_requested.clear()
+        try:
+            flush_activity_log()
+        except Exception:
+            logger.exception("Failed to write activity log")
+
+
+def _flush_activity_log_on_exit():
+    try:
+        flush_activity_log()
+    except Exception:
+        # Nothing flushes after this; what is still queued is lost too
+        lost = 0
+        while batch := _drain(ACTIVITY_LOG_BATCH_SIZE):
+            lost += len(batch)
+        _count('failed', lost)
+        logger.exception("Failed to write activity log on shutdown; %d more events not written", lost)
+
+
+def start_activity_writer():
+    """Start the background writer (once per process) and flush on shutdown."""
+    global _writer_thread
+    if _writer_thread is not None:
+        return
+    _writer_thread = threading.Thread(target=_writer_loop,
+                                      name="activity-log-writer", daemon=True)
+    _writer_thread.start()
+    atexit.register(_flush_activity_log_on_exit)
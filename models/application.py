@@ -1,9 +1,21 @@
-from db import get_db_connection
+import logging
+from datetime import date
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from db import get_db_connection, get_read_connection
+from models.job import APPLICATION_STATUSES, bump_shared_jobs_version, note_jobs_closed
+from models.notification import notify_application_status
+from models.activity_log import log_activity
+from models.stats import adjust_admin_stats, invalidate_admin_stats
+
+logger = logging.getLogger(__name__)
 
 # -------------------- STUDENT SIDE --------------------
 
 def has_applied(student_id, job_id):
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
 
     cur.execute(
@@ -17,28 +29,95 @@ def has_applied(student_id, job_id):
     return exists
 
 
+# Results of apply_for_job()
+APPLY_OK = 'applied'
+APPLY_DUPLICATE = 'already_applied'
+APPLY_NOT_FOUND = 'not_found'
+APPLY_CLOSED = 'closed'
+APPLY_DEADLINE_PASSED = 'deadline_passed'
+APPLY_FULL = 'full'
+
+
 def apply_for_job(student_id, job_id, cover_letter=None):
     """
     Apply for a job. Optionally include a cover letter.
+
+    Runs as one transaction: the job row is locked, its status, deadline
+    and max_applications are checked against current_applications, and the
+    application is inserted. Duplicates are caught by the unique_application
+    key rather than a separate check. The insert trigger closes the job if
+    this application fills it.
+
+    Returns a dict with 'status' (one of the APPLY_* values) and
+    'application_id' (None unless the application was created).
     """
     conn = get_db_connection()
-    cur = conn.cursor()
+    cur = conn.cursor(dictionary=True)
+    result = {'status': APPLY_OK, 'application_id': None}
+    fills_job = False
 
-    cur.execute(
-        "INSERT INTO applications (student_id, job_id, cover_letter) VALUES (%s, %s, %s)",
-        (student_id, job_id, cover_letter)
-    )
+    try:
+        # Lock the job row so concurrent applicants are checked one at a time
+        cur.execute(
+            """
+            SELECT status, application_deadline, max_applications, current_applications
+            FROM jobs
+            WHERE id = %s
+            FOR UPDATE
+            """,
+            (job_id,)
+        )
+        job = cur.fetchone()
 
-    conn.commit()
-    cur.close()
-    conn.close()
+        if not job:
+            result['status'] = APPLY_NOT_FOUND
+        elif job['status'] != 'active':
+            result['status'] = APPLY_CLOSED
+        elif job['application_deadline'] and job['application_deadline'] < date.today():
+            result['status'] = APPLY_DEADLINE_PASSED
+        elif job['max_applications'] is not None and job['current_applications'] >= job['max_applications']:
+            result['status'] = APPLY_FULL
+        else:
+            cur.execute(
+                "INSERT INTO applications (student_id, job_id, cover_letter) VALUES (%s, %s, %s)",
+                (student_id, job_id, cover_letter)
+            )
+            result['application_id'] = cur.lastrowid
+            fills_job = (job['max_applications'] is not None
+                         and job['current_applications'] + 1 >= job['max_applications'])
+            if fills_job:
+                bump_shared_jobs_version(cur)
+
+        if result['status'] == APPLY_OK:
+            conn.commit()
+        else:
+            conn.rollback()
+    except mysql.connector.IntegrityError as e:
+        conn.rollback()
+        if e.errno != errorcode.ER_DUP_ENTRY:
+            raise
+        result['status'] = APPLY_DUPLICATE
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    if result['status'] == APPLY_OK:
+        adjust_admin_stats(total_applications=1, pending_applications=1)
+        log_activity('application_created', 'application', result['application_id'],
+                     {'job_id': job_id, 'student_id': student_id})
+        if fills_job:
+            note_jobs_closed([job_id])  # Closed by the insert trigger
+    return result
 
 
 def get_applications_for_student(student_id):
     """
     Get all applications for a student with job and company details.
     """
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor(dictionary=True)
 
     cur.execute(
@@ -76,7 +155,7 @@ def get_applicants_for_company_job(company_id, job_id):
     """
     Get all applicants for a specific job posting with student details.
     """
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor(dictionary=True)
 
     cur.execute(
@@ -113,6 +192,81 @@ def get_applicants_for_company_job(company_id, job_id):
     conn.close()
     return applicants
 
+# Columns of the applicant export, in order
+APPLICANT_EXPORT_COLUMNS = (
+    'application_id', 'student_name', 'student_email', 'course', 'cgpa',
+    'skills', 'resume_url', 'linkedin_url', 'github_url',
+    'status', 'applied_at', 'reviewed_at', 'notes'
+)
+
+def iter_applicants_for_export(company_id, job_id, status=None, min_cgpa=None,
+                               max_cgpa=None, chunk_size=500):
+    """
+    Yield applicant rows (tuples in APPLICANT_EXPORT_COLUMNS order) for a job.
+
+    Rows are read from an unbuffered cursor chunk_size at a time, so memory
+    use does not grow with the number of applicants. Only jobs belonging to
+    company_id are exported.
+    """
+    conditions = ["j.company_id = %s", "a.job_id = %s"]
+    values = [company_id, job_id]
+    if status:
+        conditions.append("a.status = %s")
+        values.append(status)
+    if min_cgpa is not None:
+        conditions.append("s.cgpa >= %s")
+        values.append(min_cgpa)
+    if max_cgpa is not None:
+        conditions.append("s.cgpa <= %s")
+        values.append(max_cgpa)
+
+    conn = get_read_connection()
+    cur = conn.cursor(buffered=False)
+
+    try:
+        cur.execute(
+            f"""
+            SELECT 
+                a.id,
+                s.name,
+                u.email,
+                s.course,
+                s.cgpa,
+                s.skills,
+                s.resume_url,
+                s.linkedin_url,
+                s.github_url,
+                a.status,
+                a.applied_at,
+                a.reviewed_at,
+                a.notes
+            FROM applications a
+            JOIN students s ON a.student_id = s.id
+            JOIN users u ON s.user_id = u.id
+            JOIN jobs j ON a.job_id = j.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY a.applied_at DESC
+            """,
+            values
+        )
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cur.close()
+        conn.close()
+
+def _record_status_change(application_ids, status):
+    for application_id in application_ids:
+        log_activity('application_status_changed', 'application', application_id, {'status': status})
+    # The update is committed either way; don't report it as failed
+    try:
+        notify_application_status(application_ids, status)
+    except Exception:
+        logger.exception("Failed to send status notifications")
+
 def update_application_status(application_id, status, notes=None):
     """
     Update the status of an application (for companies to manage applications).
@@ -143,11 +297,88 @@ def update_application_status(application_id, status, notes=None):
     cur.close()
     conn.close()
 
+    # The previous status is unknown here, so recount on the next dashboard load
+    invalidate_admin_stats()
+    _record_status_change([application_id], status)
+
+def bulk_update_application_status(company_id, job_id, application_ids, status, notes=None):
+    """
+    Set one status (and optionally a note) on many applications at once.
+
+    All ids must be applications to job_id, a job of the given company,
+    otherwise nothing is changed and ValueError is raised. Runs as a single transaction with one
+    set-based UPDATE. Returns a dict with 'updated' and 'previous_statuses',
+    the number of changed applications per status they had before.
+    """
+    if status not in APPLICATION_STATUSES:
+        raise ValueError(f"Invalid status: {status}")
+
+    application_ids = sorted({int(app_id) for app_id in application_ids})
+    if not application_ids:
+        return {'updated': 0, 'previous_statuses': {}}
+
+    placeholders = ', '.join(['%s'] * len(application_ids))
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    try:
+        # Lock the rows and check ownership in the same pass
+        cur.execute(
+            f"""
+            SELECT a.status, COUNT(*) AS count
+            FROM applications a
+            JOIN jobs j ON a.job_id = j.id
+            WHERE a.id IN ({placeholders})
+              AND a.job_id = %s
+              AND j.company_id = %s
+            GROUP BY a.status
+            FOR UPDATE
+            """,
+            application_ids + [job_id, company_id]
+        )
+        previous = {row['status']: row['count'] for row in cur.fetchall()}
+
+        if sum(previous.values()) != len(application_ids):
+            raise ValueError("Some applications do not exist or do not belong to this job.")
+
+        cur.execute(
+            f"""
+            UPDATE applications
+            SET status = %s,
+                reviewed_at = CURRENT_TIMESTAMP,
+                notes = COALESCE(%s, notes)
+            WHERE id IN ({placeholders})
+            """,
+            [status, notes] + application_ids
+        )
+        updated = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    # Keep the admin snapshot's pending/accepted counters in step
+    deltas = {}
+    for key, counted_status in (('pending_applications', 'pending'),
+                                ('accepted_applications', 'accepted')):
+        delta = -previous.get(counted_status, 0)
+        if status == counted_status:
+            delta += len(application_ids)
+        if delta:
+            deltas[key] = delta
+    adjust_admin_stats(**deltas)
+    _record_status_change(application_ids, status)
+
+    return {'updated': updated, 'previous_statuses': previous}
+
 def get_application_by_id(application_id):
     """
     Get a specific application by ID.
     """
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor(dictionary=True)
     
     cur.execute(
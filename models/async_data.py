@@ -0,0 +1,129 @@
+"""
+Asyncio access to the read-only model functions.
+
+Every coroutine here runs the model function of the same name on a worker
+thread inside its own application context, and therefore on its own pooled
+connection. Reads awaited together with asyncio.gather() run on the database
+at the same time, so a dashboard costs its slowest query rather than the sum
+of all of them. Synchronous views call run_concurrently().
+
+Workers inherit the calling request's routing: when the request must see its
+own writes (see db.DB_READ_YOUR_WRITES) they read from the primary too, and
+their statements are recorded in the request's SQL profile.
+
+mysql-connector-python has no asyncio API in the version we pin, so the
+driver stays blocking and concurrency comes from ASYNC_DB_WORKERS threads.
+Each in-flight read holds one connection on top of the one its request
+already holds, so ASYNC_DB_WORKERS defaults to a quarter of
+DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW; raising it towards the pool's size lets
+dashboard reads starve ordinary requests of connections.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, g, has_app_context
+
+from db import POOL_CONFIG, pin_reads_to_primary, reads_need_primary
+from models import application, company, job, notification, ranking, recommendations, stats, student, user
+
+ASYNC_DB_WORKERS = int(os.environ.get(
+    "ASYNC_DB_WORKERS", max((POOL_CONFIG["pool_size"] + POOL_CONFIG["max_overflow"]) // 4, 1)
+))
+
+_executor = ThreadPoolExecutor(max_workers=ASYNC_DB_WORKERS, thread_name_prefix="async-db")
+
+
+def _run_in_app_context(app, read_primary, sql_profile, fn, args, kwargs):
+    # A fresh app context gives the worker its own g, so it never touches the
+    # request's connection; teardown returns the worker's connection.
+    with app.app_context():
+        if read_primary:
+            pin_reads_to_primary()
+        if sql_profile is not None:
+            g.sql_profile = sql_profile
+        return fn(*args, **kwargs)
+
+
+async def run_read(fn, *args, **kwargs):
+    """Run a blocking read function on a worker thread and await its result."""
+    if has_app_context():
+        call = functools.partial(
+            _run_in_app_context, current_app._get_current_object(),
+            reads_need_primary(), g.get("sql_profile"), fn, args, kwargs
+        )
+    else:
+        call = functools.partial(fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+
+def run_concurrently(*coroutines):
+    """
+    Adapter for synchronous code such as Flask views: run the coroutines
+    concurrently and return their results in order. Waits for all of them
+    before raising the first exception, so no read outlives the caller.
+    Must not be called from a running event loop.
+    """
+    async def gather():
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    results = asyncio.run(gather())
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def _mirror(fn):
+    @functools.wraps(fn)
+    async def read(*args, **kwargs):
+        return await run_read(fn, *args, **kwargs)
+    return read
+
+
+# -------------------- MODEL READS --------------------
+
+has_applied = _mirror(application.has_applied)
+get_applications_for_student = _mirror(application.get_applications_for_student)
+get_applicants_for_company_job = _mirror(application.get_applicants_for_company_job)
+get_application_by_id = _mirror(application.get_application_by_id)
+
+get_company_id_by_user_id = _mirror(company.get_company_id_by_user_id)
+get_company_profile = _mirror(company.get_company_profile)
+get_company_by_id = _mirror(company.get_company_by_id)
+
+get_jobs_by_company = _mirror(job.get_jobs_by_company)
+get_company_job_stats = _mirror(job.get_company_job_stats)
+get_active_jobs = _mirror(job.get_active_jobs)
+get_job_board_page = _mirror(job.get_job_board_page)
+search_jobs = _mirror(job.search_jobs)
+get_job_by_id = _mirror(job.get_job_by_id)
+
+get_unread_count = _mirror(notification.get_unread_count)
+get_notifications_page = _mirror(notification.get_notifications_page)
+
+get_ranked_applicants = _mirror(ranking.get_ranked_applicants)
+get_recommended_jobs = _mirror(recommendations.get_recommended_jobs)
+
+compute_admin_stats = _mirror(stats.compute_admin_stats)
+
+get_student_id_by_user_id = _mirror(student.get_student_id_by_user_id)
+get_student_profile = _mirror(student.get_student_profile)
+get_student_dashboard_data = _mirror(student.get_student_dashboard_data)
+
+get_user_by_id = _mirror(user.get_user_by_id)
+
+
+# -------------------- DASHBOARDS --------------------
+
+async def company_dashboard(user_id, company_id):
+    """
+    (company, job_stats) for the company dashboard, read concurrently.
+    job_stats is None when the company has no profile yet.
+    """
+    if company_id is None:
+        return await get_company_profile(user_id), None
+    return tuple(await asyncio.gather(get_company_profile(user_id),
+                                      get_company_job_stats(company_id)))
+
@@ -1,7 +1,10 @@
-from db import get_db_connection
+from db import get_db_connection, get_read_connection
+from models.stats import adjust_admin_stats
+from models.user import invalidate_identity
+from models.activity_log import log_activity
 
 def get_company_id_by_user_id(user_id):
-    conn = get_db_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
 
     cursor.execute(
@@ -22,18 +25,10 @@ def save_company_profile(user_id, company_name=None, hr_email=None, company_type
     """
     Save or update company profile with all available fields.
     Only updates fields that are provided (not None).
+
+    One INSERT ... ON DUPLICATE KEY UPDATE on the unique user_id, as in
+    save_student_profile. When nothing changes no activity is logged.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    
-    # Get existing profile
-    cursor.execute("SELECT * FROM companies WHERE user_id = %s", (user_id,))
-    existing = cursor.fetchone()
-    
-    # Prepare update values
-    update_fields = []
-    values = []
-    
     fields_map = {
         'company_name': company_name,
         'hr_email': hr_email,
@@ -45,40 +40,45 @@ def save_company_profile(user_id, company_name=None, hr_email=None, company_type
         'description': description,
         'logo_url': logo_url
     }
-    
-    for field, value in fields_map.items():
-        if value is not None:
-            update_fields.append(f"{field} = %s")
-            values.append(value)
-    
-    if existing:
-        # Update existing profile
-        if update_fields:
-            values.append(user_id)
-            query = f"""
-                UPDATE companies 
-                SET {', '.join(update_fields)}
-                WHERE user_id = %s
-            """
-            cursor.execute(query, values)
-    else:
-        # Insert new profile
-        insert_fields = ['user_id'] + [k for k, v in fields_map.items() if v is not None]
-        insert_values = [user_id] + [v for v in fields_map.values() if v is not None]
-        
-        placeholders = ', '.join(['%s'] * len(insert_values))
-        query = f"""
-            INSERT INTO companies ({', '.join(insert_fields)})
-            VALUES ({placeholders})
-        """
-        cursor.execute(query, insert_values)
-
-    conn.commit()
-    cursor.close()
-    conn.close()
+    fields = [field for field, value in fields_map.items() if value is not None]
+
+    # id = LAST_INSERT_ID(id) makes lastrowid the existing id on update
+    query = f"""
+        INSERT INTO companies (user_id{''.join(f', {field}' for field in fields)})
+        VALUES (%s{', %s' * len(fields)})
+        ON DUPLICATE KEY UPDATE
+            id = LAST_INSERT_ID(id){''.join(f', {field} = VALUES({field})' for field in fields)}
+    """
 
-def get_company_profile(user_id):
     conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, [user_id] + [fields_map[field] for field in fields])
+        # Affected rows: 1 inserted, 2 updated, 0 unchanged
+        outcome, company_id = cursor.rowcount, cursor.lastrowid
+        if outcome:
+            conn.commit()
+        else:
+            conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not outcome:
+        return
+
+    log_activity('company_profile_created' if outcome == 1 else 'company_profile_updated',
+                 'company', company_id, {'fields': fields}, user_id=user_id)
+
+    if outcome == 1:
+        adjust_admin_stats(total_companies=1)
+        invalidate_identity(user_id)
+
+def get_company_profile(user_id):
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
 
     cursor.execute(
@@ -91,7 +91,7 @@ def get_company_profile(user_id):
     return company
 
 def get_company_by_id(company_id):
-    conn = get_db_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
 
     cursor.execute(
@@ -1,10 +1,23 @@
-from db import get_db_connection
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from cache import TTLCache
+from db import bump_cache_version, get_db_connection, get_read_connection, read_cache_version
+from models.notification import queue_new_job_notification
+from models.stats import adjust_admin_stats
+
+logger = logging.getLogger(__name__)
 
 def create_job(company_id, title, description, eligibility, requirements=None,
                location=None, job_type='full-time', salary_min=None, salary_max=None,
                currency='INR', application_deadline=None, max_applications=100):
     """
     Create a new job posting with all available fields.
+    Returns the new job's id.
     """
     conn = get_db_connection()
     cur = conn.cursor()
@@ -20,27 +33,382 @@ def create_job(company_id, title, description, eligibility, requirements=None,
          location, job_type, salary_min, salary_max, currency,
          application_deadline, max_applications)
     )
+    job_id = cur.lastrowid
+    bump_shared_jobs_version(cur)
     conn.commit()
 
     cur.close()
     conn.close()
 
-def increment_job_views(job_id):
-    """Increment view count for a job"""
+    adjust_admin_stats(total_jobs=1, active_jobs=1)
+    _search_cache.clear()
+    bump_jobs_version()
+
+    from models.recommendations import index_job
+    index_job(job_id, title, requirements)
+
+    # Students are told in the background; the posting doesn't wait for it
+    queue_new_job_notification(job_id, title, company_id)
+    return job_id
+
+def close_job(company_id, job_id):
+    """
+    Close one of a company's active jobs so it stops taking applications.
+    Returns True if the job was closed.
+    """
     conn = get_db_connection()
     cur = conn.cursor()
-    
+
     cur.execute(
-        "UPDATE jobs SET views_count = views_count + 1 WHERE id = %s",
-        (job_id,)
+        "UPDATE jobs SET status = 'closed' WHERE id = %s AND company_id = %s AND status = 'active'",
+        (job_id, company_id)
     )
+    closed = cur.rowcount > 0
+    if closed:
+        bump_shared_jobs_version(cur)
     conn.commit()
+
     cur.close()
     conn.close()
 
+    if closed:
+        note_jobs_closed([job_id])
+    return closed
+
+def note_jobs_closed(job_ids):
+    """
+    Update this process's caches after jobs were closed in the database.
+    Other processes notice through the shared jobs version.
+    """
+    adjust_admin_stats(active_jobs=-len(job_ids))
+    _search_cache.clear()
+    bump_jobs_version()
+
+    from models.recommendations import unindex_jobs
+    unindex_jobs(job_ids)
+
+# -------------------- JOBS VERSION STAMP --------------------
+# Whole-second timestamp of the last change to the visible job listings, used
+# for HTTP validators (see routes.response_cache). Each bump moves it forward
+# by at least a second so Last-Modified always changes with it.
+#
+# Every transaction that changes the listings also bumps the 'jobs' row of
+# cache_versions. Each process reads that row at most every
+# JOBS_VERSION_REFRESH seconds; when another process has moved it, the local
+# stamp is bumped and the search cache cleared.
+
+JOBS_VERSION_REFRESH = float(os.environ.get("JOBS_VERSION_REFRESH", 5))
+
+_jobs_version = int(time.time())
+_jobs_version_lock = threading.Lock()
+_shared_version = None
+_shared_checked_at = None
+_shared_refresh_lock = threading.Lock()
+
+
+def bump_jobs_version(at_least=0):
+    """Record that the set of visible jobs changed."""
+    global _jobs_version
+    with _jobs_version_lock:
+        _jobs_version = max(int(time.time()), _jobs_version + 1, at_least)
+
+
+def bump_shared_jobs_version(cur):
+    """Bump the shared jobs version in the caller's transaction, before it commits."""
+    bump_cache_version(cur, 'jobs')
+
+
+def _refresh_shared_jobs_version():
+    global _shared_version
+    shared = read_cache_version('jobs')
+    if shared is not None and _shared_version is not None and shared != _shared_version:
+        _search_cache.clear()
+        bump_jobs_version(at_least=shared)
+    _shared_version = shared
+
+
+def get_jobs_version():
+    global _shared_checked_at
+    now = time.monotonic()
+    if _shared_checked_at is None or now - _shared_checked_at >= JOBS_VERSION_REFRESH:
+        # One thread refreshes; the others use the stamp they have
+        if _shared_refresh_lock.acquire(blocking=False):
+            try:
+                _shared_checked_at = now
+                _refresh_shared_jobs_version()
+            except Exception:
+                logger.debug("Could not read the shared jobs version", exc_info=True)
+            finally:
+                _shared_refresh_lock.release()
+    return _jobs_version
+
+# -------------------- VIEW COUNTER BUFFER --------------------
+# Job detail views are counted in memory and written back in bulk by a
+# background flusher, so reading a job page never writes to the database.
+# At most MAX_PENDING_VIEWS views (plus one flush interval) can be lost if the
+# process dies without running the shutdown flush. While the database is
+# unreachable, views beyond MAX_PENDING_VIEWS are dropped and counted.
+
+VIEW_FLUSH_INTERVAL = float(os.environ.get("JOB_VIEW_FLUSH_INTERVAL", 10))
+MAX_PENDING_VIEWS = int(os.environ.get("JOB_VIEW_MAX_PENDING", 1000))
+
+_pending_views = {}
+_pending_total = 0
+_views_dropped = 0
+_views_lock = threading.Lock()
+_flush_requested = threading.Event()
+_flusher_thread = None
+
+
+def record_job_view(job_id):
+    """Count a view for a job. The database is updated by the flusher."""
+    global _pending_total
+    with _views_lock:
+        _pending_views[job_id] = _pending_views.get(job_id, 0) + 1
+        _pending_total += 1
+        if _pending_total >= MAX_PENDING_VIEWS:
+            _flush_requested.set()
+
+
+def flush_job_views():
+    """
+    Write all buffered views in one UPDATE. Returns the number of views written.
+    """
+    global _pending_views, _pending_total
+    with _views_lock:
+        if not _pending_views:
+            return 0
+        pending, _pending_views = _pending_views, {}
+        written, _pending_total = _pending_total, 0
+
+    # Sorted ids keep lock order stable between concurrent flushes
+    job_ids = sorted(pending)
+    cases = " ".join(["WHEN %s THEN %s"] * len(job_ids))
+    placeholders = ", ".join(["%s"] * len(job_ids))
+    values = [v for job_id in job_ids for v in (job_id, pending[job_id])] + job_ids
+
+    try:
+        conn = get_db_connection()
+    except Exception:
+        _requeue_views(pending)
+        raise
+
+    # Outside a request nothing else returns the connection, so always close it
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            UPDATE jobs
+            SET views_count = views_count + CASE id {cases} ELSE 0 END
+            WHERE id IN ({placeholders})
+            """,
+            values
+        )
+        conn.commit()
+    except Exception:
+        _requeue_views(pending)
+        conn.rollback()
+        raise
+    finally:
+        if cur is not None:
+            cur.close()
+        conn.close()
+
+    return written
+
+
+def _requeue_views(pending):
+    """Put a failed flush's counts back for the next one, up to MAX_PENDING_VIEWS."""
+    global _pending_total, _views_dropped
+    with _views_lock:
+        room = max(MAX_PENDING_VIEWS - _pending_total, 0)
+        for job_id, count in pending.items():
+            kept = min(count, room)
+            if kept:
+                _pending_views[job_id] = _pending_views.get(job_id, 0) + kept
+                room -= kept
+            _pending_total += kept
+            _views_dropped += count - kept
+
+
+def get_job_view_stats():
+    """Views waiting for the next flush, and views dropped because flushes kept failing."""
+    with _views_lock:
+        return {'pending': _pending_total, 'dropped': _views_dropped,
+                'max_pending': MAX_PENDING_VIEWS, 'interval': VIEW_FLUSH_INTERVAL}
+
+
+def _view_flusher_loop():
+    while True:
+        _flush_requested.wait(VIEW_FLUSH_INTERVAL)
+        _flush_requested.clear()
+        try:
+            flush_job_views()
+        except Exception:
+            logger.exception("Failed to flush job views")
+
+
+def _flush_job_views_on_exit():
+    try:
+        flush_job_views()
+    except Exception:
+        logger.exception("Failed to flush job views on shutdown")
+
+
+def start_view_flusher():
+    """Start the background view flusher (once per process) and flush on shutdown."""
+    global _flusher_thread
+    if _flusher_thread is not None:
+        return
+    _flusher_thread = threading.Thread(target=_view_flusher_loop,
+                                       name="job-view-flusher", daemon=True)
+    _flusher_thread.start()
+    atexit.register(_flush_job_views_on_exit)
+
+# -------------------- JOB EXPIRY SWEEP --------------------
+# The insert trigger on applications closes a job as soon as it fills. Jobs
+# past their application deadline (and any that filled before the trigger
+# existed) are closed in bulk by a background sweeper every JOB_SWEEP_INTERVAL
+# seconds. Listings still filter on the deadline themselves, so an expired job
+# disappears at midnight even if the sweeper is late or turned off. A closed
+# job is not reopened if applications are later deleted.
+#
+# Every app process starts a sweeper with its first request, but a sweep
+# holds a MySQL advisory lock and is skipped while another process holds it.
+# To sweep from cron instead, set JOB_SWEEP_INTERVAL=0 for the app and run
+# sweep_jobs.py.
+
+JOB_SWEEP_INTERVAL = float(os.environ.get("JOB_SWEEP_INTERVAL", 300))  # 0 disables the sweeper
+JOB_SWEEP_BATCH_SIZE = 500
+# Advisory lock name, per database so two apps on one server don't block each other
+_SWEEP_LOCK = "CONCAT(DATABASE(), '.close_expired_jobs')"
+
+_sweep_stats = {'sweeps': 0, 'skipped': 0, 'jobs_closed': 0, 'failures': 0, 'last_sweep': None}
+_sweep_lock = threading.Lock()
+_sweeper_thread = None
+
+
+def close_expired_jobs(batch_size=JOB_SWEEP_BATCH_SIZE):
+    """
+    Close every active job whose deadline has passed or that is full.
+
+    Each batch locks up to batch_size matching rows with one
+    SELECT ... FOR UPDATE and closes them with one UPDATE. Returns a dict with
+    'closed', 'expired', 'full' and 'seconds', or None if another process is
+    already sweeping.
+    """
+    start = time.perf_counter()
+    expired = full = 0
 
-def get_jobs_by_company(company_id):
     conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT GET_LOCK({_SWEEP_LOCK}, 0)")
+        locked = cur.fetchone()[0] == 1
+    except Exception:
+        cur.close()
+        conn.close()
+        raise
+    if not locked:
+        cur.close()
+        conn.close()
+        with _sweep_lock:
+            _sweep_stats['skipped'] += 1
+        return None
+
+    try:
+        while True:
+            cur.execute(
+                """
+                SELECT id, application_deadline < CURDATE()
+                FROM jobs
+                WHERE status = 'active'
+                  AND (application_deadline < CURDATE()
+                       OR (max_applications IS NOT NULL AND current_applications >= max_applications))
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE
+                """,
+                (batch_size,)
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+
+            job_ids = [job_id for job_id, _ in rows]
+            cur.execute(
+                f"UPDATE jobs SET status = 'closed' WHERE id IN ({', '.join(['%s'] * len(job_ids))})",
+                job_ids
+            )
+            bump_shared_jobs_version(cur)
+            conn.commit()
+            note_jobs_closed(job_ids)
+
+            batch_expired = sum(1 for _, is_expired in rows if is_expired)
+            expired += batch_expired
+            full += len(rows) - batch_expired
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        conn.rollback()
+        with _sweep_lock:
+            _sweep_stats['failures'] += 1
+        raise
+    finally:
+        try:
+            cur.execute(f"SELECT RELEASE_LOCK({_SWEEP_LOCK})")
+            cur.fetchall()
+        except Exception:
+            pass  # A lost session has released the lock with it
+        cur.close()
+        conn.close()
+
+    result = {
+        'closed': expired + full,
+        'expired': expired,
+        'full': full,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    with _sweep_lock:
+        _sweep_stats['sweeps'] += 1
+        _sweep_stats['jobs_closed'] += result['closed']
+        _sweep_stats['last_sweep'] = dict(result, at=time.time())
+    return result
+
+
+def get_job_sweep_stats():
+    with _sweep_lock:
+        return dict(_sweep_stats, interval=JOB_SWEEP_INTERVAL)
+
+
+def _sweeper_loop():
+    while True:
+        try:
+            result = close_expired_jobs()
+            if result and result['closed']:
+                logger.info("Closed %d jobs (%d past deadline, %d full) in %.3fs",
+                            result['closed'], result['expired'], result['full'], result['seconds'])
+        except Exception:
+            logger.exception("Failed to close expired jobs")
+        time.sleep(JOB_SWEEP_INTERVAL)
+
+
+def start_job_sweeper():
+    """
+    Start the background expiry sweeper (once per process), unless
+    JOB_SWEEP_INTERVAL is 0. Cheap to call again once it is running.
+    """
+    global _sweeper_thread
+    if _sweeper_thread is not None or JOB_SWEEP_INTERVAL <= 0:
+        return
+    _sweeper_thread = threading.Thread(target=_sweeper_loop,
+                                       name="job-expiry-sweeper", daemon=True)
+    _sweeper_thread.start()
+
+
+def get_jobs_by_company(company_id):
+    conn = get_read_connection()
     cur = conn.cursor(dictionary=True)
 
     cur.execute(
@@ -53,8 +421,71 @@ def get_jobs_by_company(company_id):
     conn.close()
     return jobs
 
+APPLICATION_STATUSES = ('pending', 'reviewed', 'shortlisted', 'accepted', 'rejected', 'withdrawn')
+
+
+def get_company_job_stats(company_id):
+    """
+    Dashboard statistics for a company in one grouped query.
+
+    Extends sp_get_company_job_stats with a per-job breakdown of applicants by
+    status. Returns a dict with company totals (total_jobs, active_jobs,
+    total_applications, total_views, applicants_by_status) and the per-job
+    rows under 'jobs'.
+    """
+    status_columns = ",\n            ".join(
+        f"COALESCE(SUM(a.status = '{status}'), 0) AS {status}"
+        for status in APPLICATION_STATUSES
+    )
+
+    conn = get_read_connection()
+    cur = conn.cursor(dictionary=True)
+
+    cur.execute(
+        f"""
+        SELECT
+            j.id,
+            j.title,
+            j.status,
+            j.views_count,
+            j.current_applications,
+            j.max_applications,
+            j.application_deadline,
+            {status_columns}
+        FROM jobs j
+        LEFT JOIN applications a ON a.job_id = j.id
+        WHERE j.company_id = %s
+        GROUP BY j.id
+        ORDER BY j.created_at DESC
+        """,
+        (company_id,)
+    )
+
+    jobs = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    stats = {
+        'total_jobs': len(jobs),
+        'active_jobs': 0,
+        'total_applications': 0,
+        'total_views': 0,
+        'applicants_by_status': dict.fromkeys(APPLICATION_STATUSES, 0),
+        'jobs': jobs,
+    }
+    for job in jobs:
+        for status in APPLICATION_STATUSES:
+            job[status] = int(job[status])
+            stats['applicants_by_status'][status] += job[status]
+        if job['status'] == 'active':
+            stats['active_jobs'] += 1
+        stats['total_applications'] += job['current_applications'] or 0
+        stats['total_views'] += job['views_count'] or 0
+
+    return stats
+
 def get_active_jobs():
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor(dictionary=True)
 
     cur.execute(
@@ -72,8 +503,205 @@ def get_active_jobs():
     conn.close()
     return jobs
 
+# -------------------- JOB BOARD --------------------
+# Keyset pagination on (created_at, id), newest first. Only the columns the
+# listing shows are selected, and the description is truncated in SQL. Full
+# and expired jobs are closed as they happen (see JOB EXPIRY SWEEP), so a page
+# is an index range scan on idx_status_created_id; the deadline check only
+# skips the few expired jobs the sweeper has not closed yet.
+
+JOB_BOARD_PAGE_SIZE = int(os.environ.get("JOB_BOARD_PAGE_SIZE", 20))
+
+JOB_LISTING_COLUMNS = """
+    j.id,
+    j.title,
+    LEFT(j.description, 201) AS description,
+    j.eligibility,
+    j.location,
+    j.job_type,
+    j.salary_min,
+    j.salary_max,
+    j.currency,
+    j.application_deadline,
+    j.created_at,
+    c.company_name
+"""
+
+JOB_VISIBLE_CONDITIONS = (
+    "j.status = 'active' "
+    "AND (j.application_deadline IS NULL OR j.application_deadline >= CURDATE())"
+)
+
+
+def encode_job_cursor(job):
+    return f"{job['created_at'].strftime('%Y%m%d%H%M%S')}-{job['id']}"
+
+
+def decode_job_cursor(cursor):
+    """Returns (created_at, id), or None if the cursor is malformed."""
+    try:
+        stamp, job_id = cursor.split('-', 1)
+        return datetime.strptime(stamp, '%Y%m%d%H%M%S'), int(job_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_job_board_page(after=None, before=None, page_size=None):
+    """
+    Get one page of the job board.
+
+    Pass the next_cursor of a page as `after` to move forward, or its
+    prev_cursor as `before` to move back. Returns a dict with 'jobs',
+    'next_cursor' and 'prev_cursor' (None when there is no such page).
+    """
+    page_size = page_size or JOB_BOARD_PAGE_SIZE
+    after_key = decode_job_cursor(after) if after else None
+    before_key = decode_job_cursor(before) if before and not after_key else None
+
+    conditions = [JOB_VISIBLE_CONDITIONS]
+    values = []
+    if after_key:
+        conditions.append("(j.created_at < %s OR (j.created_at = %s AND j.id < %s))")
+        values += [after_key[0], after_key[0], after_key[1]]
+        order = "DESC"
+    elif before_key:
+        conditions.append("(j.created_at > %s OR (j.created_at = %s AND j.id > %s))")
+        values += [before_key[0], before_key[0], before_key[1]]
+        order = "ASC"
+    else:
+        order = "DESC"
+
+    conn = get_read_connection()
+    cur = conn.cursor(dictionary=True)
+
+    # One extra row tells us whether there is another page in this direction
+    cur.execute(
+        f"""
+        SELECT {JOB_LISTING_COLUMNS}
+        FROM jobs j
+        INNER JOIN companies c ON j.company_id = c.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY j.created_at {order}, j.id {order}
+        LIMIT %s
+        """,
+        values + [page_size + 1]
+    )
+
+    jobs = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    has_more = len(jobs) > page_size
+    jobs = jobs[:page_size]
+    if before_key:
+        jobs.reverse()
+
+    if not jobs:
+        if before_key:
+            # Nothing newer than a stale cursor; show the first page instead
+            return get_job_board_page(page_size=page_size)
+        return {'jobs': [], 'next_cursor': None, 'prev_cursor': None}
+
+    if before_key:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after_key is not None
+
+    return {
+        'jobs': jobs,
+        'next_cursor': encode_job_cursor(jobs[-1]) if has_next else None,
+        'prev_cursor': encode_job_cursor(jobs[0]) if has_prev else None,
+    }
+
+# -------------------- JOB SEARCH --------------------
+# Relevance-ranked search on the idx_title_description FULLTEXT index,
+# combined with indexed filters. Results for identical searches are cached
+# for JOB_SEARCH_CACHE_TTL seconds.
+
+JOB_SEARCH_CACHE_TTL = float(os.environ.get("JOB_SEARCH_CACHE_TTL", 30))
+
+_search_cache = TTLCache(maxsize=512, ttl=JOB_SEARCH_CACHE_TTL)
+
+
+def search_jobs(query=None, job_type=None, location=None, salary_min=None,
+                salary_max=None, deadline_from=None, page=1, page_size=None):
+    """
+    Search visible jobs by keywords and filters.
+
+    With a query, results are ordered by MATCH ... AGAINST relevance;
+    without one, newest first. salary_min/salary_max select jobs whose
+    salary range overlaps the requested one, and deadline_from keeps jobs
+    whose deadline is on or after that date (or have none).
+    Returns a dict with 'jobs', 'page' and 'has_next'.
+    """
+    query = (query or '').strip()
+    page = max(int(page or 1), 1)
+    page_size = page_size or JOB_BOARD_PAGE_SIZE
+
+    cache_key = (query.lower(), job_type, location, salary_min, salary_max,
+                 str(deadline_from) if deadline_from else None, page, page_size)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    columns = JOB_LISTING_COLUMNS
+    conditions = [JOB_VISIBLE_CONDITIONS]
+    values = []
+
+    if query:
+        columns += ", MATCH(j.title, j.description) AGAINST (%s IN NATURAL LANGUAGE MODE) AS relevance"
+        conditions.append("MATCH(j.title, j.description) AGAINST (%s IN NATURAL LANGUAGE MODE)")
+        values += [query, query]
+        order_by = "relevance DESC, j.created_at DESC"
+    else:
+        order_by = "j.created_at DESC, j.id DESC"
+
+    if job_type:
+        conditions.append("j.job_type = %s")
+        values.append(job_type)
+    if location:
+        # Prefix match so idx_location can still be used
+        conditions.append("j.location LIKE %s")
+        values.append(location.replace('%', r'\%').replace('_', r'\_') + '%')
+    if salary_min is not None:
+        conditions.append("j.salary_max >= %s")
+        values.append(salary_min)
+    if salary_max is not None:
+        conditions.append("j.salary_min <= %s")
+        values.append(salary_max)
+    if deadline_from:
+        conditions.append("(j.application_deadline IS NULL OR j.application_deadline >= %s)")
+        values.append(deadline_from)
+
+    conn = get_read_connection()
+    cur = conn.cursor(dictionary=True)
+
+    cur.execute(
+        f"""
+        SELECT {columns}
+        FROM jobs j
+        INNER JOIN companies c ON j.company_id = c.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY {order_by}
+        LIMIT %s OFFSET %s
+        """,
+        values + [page_size + 1, (page - 1) * page_size]
+    )
+
+    jobs = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    result = {
+        'jobs': jobs[:page_size],
+        'page': page,
+        'has_next': len(jobs) > page_size,
+    }
+    _search_cache.set(cache_key, result)
+    return result
+
 def get_job_by_id(job_id):
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor(dictionary=True)
 
     cur.execute(
@@ -90,8 +718,8 @@ def get_job_by_id(job_id):
     cur.close()
     conn.close()
     
-    # Increment view count
+    # Buffered; written back by the view flusher
     if job:
-        increment_job_views(job_id)
+        record_job_view(job_id)
     
     return job
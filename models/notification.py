@@ -0,0 +1,318 @@
+"""
+In-app notifications.
+
+Notifications are written in multi-row INSERTs of up to NOTIFICATION_BATCH_SIZE
+rows. Each user's unread count is cached for NOTIFICATION_COUNT_TTL seconds
+and adjusted in place when this process adds or reads notifications, so the
+badge in the navigation bar does not cost a COUNT query on every page.
+Other worker processes pick up changes when their cached count expires.
+
+Telling every student about a new job is queued by queue_new_job_notification()
+and done by a background writer, so posting a job doesn't wait for the
+fan-out. Like the activity log, the queue is bounded (fan-outs beyond
+NOTIFICATION_MAX_PENDING are dropped and counted) and flushed on shutdown.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from cache import TTLCache
+from db import get_db_connection, get_read_connection
+
+NOTIFICATION_BATCH_SIZE = 500
+NOTIFICATION_PAGE_SIZE = 20
+NOTIFICATION_COUNT_TTL = float(os.environ.get("NOTIFICATION_COUNT_TTL", 60))
+NOTIFICATION_FLUSH_INTERVAL = float(os.environ.get("NOTIFICATION_FLUSH_INTERVAL", 2))
+NOTIFICATION_MAX_PENDING = int(os.environ.get("NOTIFICATION_MAX_PENDING", 1000))
+
+# Notification types
+NOTIFY_APPLICATION_STATUS = 'application_status'
+NOTIFY_NEW_JOB = 'new_job'
+
+_unread_counts = TTLCache(maxsize=20000, ttl=NOTIFICATION_COUNT_TTL)
+_unread_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+_new_jobs = queue.Queue(maxsize=NOTIFICATION_MAX_PENDING)
+_fanout_counters = {'sent': 0, 'dropped': 0, 'failed': 0}
+_fanout_lock = threading.Lock()
+_fanout_write_lock = threading.Lock()
+_fanout_requested = threading.Event()
+_fanout_thread = None
+
+
+def _adjust_unread(counts):
+    """Apply {user_id: delta} to the cached counts that are present."""
+    with _unread_lock:
+        for user_id, delta in counts.items():
+            current = _unread_counts.get(user_id)
+            if current is not None:
+                _unread_counts.set(user_id, max(current + delta, 0))
+
+
+def create_notifications(notifications):
+    """
+    Insert notifications given as (user_id, type, title, message, link)
+    tuples, NOTIFICATION_BATCH_SIZE rows per statement. Returns the number
+    inserted.
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return 0
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        for start in range(0, len(notifications), NOTIFICATION_BATCH_SIZE):
+            batch = notifications[start:start + NOTIFICATION_BATCH_SIZE]
+            cur.execute(
+                f"""
+                INSERT INTO notifications (user_id, type, title, message, link)
+                VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))}
+                """,
+                [value for notification in batch for value in notification]
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    counts = {}
+    for notification in notifications:
+        counts[notification[0]] = counts.get(notification[0], 0) + 1
+    _adjust_unread(counts)
+    return len(notifications)
+
+
+def notify_application_status(application_ids, status):
+    """Tell the students behind these applications about their new status."""
+    application_ids = list(application_ids)
+    if not application_ids:
+        return 0
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT s.user_id, j.title, c.company_name
+        FROM applications a
+        JOIN students s ON a.student_id = s.id
+        JOIN jobs j ON a.job_id = j.id
+        JOIN companies c ON j.company_id = c.id
+        WHERE a.id IN ({', '.join(['%s'] * len(application_ids))})
+        """,
+        application_ids
+    )
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    return create_notifications(
+        (user_id, NOTIFY_APPLICATION_STATUS,
+         f"Application {status}",
+         f"Your application for {title} at {company_name} is now {status}.",
+         "/my-applications")
+        for user_id, title, company_name in rows
+    )
+
+
+def notify_new_job(job_id, title, company_id):
+    """
+    Tell every active student about a new job posting.
+    Students are read in id order one batch at a time, so memory use stays
+    flat however many students there are.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    total = 0
+    last_user_id = 0
+    try:
+        cur.execute("SELECT company_name FROM companies WHERE id = %s", (company_id,))
+        row = cur.fetchone()
+        company_name = row[0] if row else "A company"
+        message = f"{company_name} posted a new job: {title}."
+        link = f"/apply/{job_id}"
+
+        while True:
+            cur.execute(
+                """
+                SELECT u.id FROM users u
+                JOIN students s ON s.user_id = u.id
+                WHERE u.is_active = TRUE AND u.id > %s
+                ORDER BY u.id
+                LIMIT %s
+                """,
+                (last_user_id, NOTIFICATION_BATCH_SIZE)
+            )
+            user_ids = [user_id for (user_id,) in cur.fetchall()]
+            if not user_ids:
+                break
+            total += create_notifications(
+                (user_id, NOTIFY_NEW_JOB, "New job posted", message, link)
+                for user_id in user_ids
+            )
+            last_user_id = user_ids[-1]
+    finally:
+        cur.close()
+        conn.close()
+    return total
+
+
+def _count_fanout(key):
+    with _fanout_lock:
+        _fanout_counters[key] += 1
+
+
+def queue_new_job_notification(job_id, title, company_id):
+    """
+    Queue notify_new_job() for the background writer. Never blocks; returns
+    False if the queue is full and the fan-out was dropped.
+    """
+    try:
+        _new_jobs.put_nowait((job_id, title, company_id))
+    except queue.Full:
+        _count_fanout('dropped')
+        logger.warning("Notification queue full; no new-job notifications for job %s", job_id)
+        return False
+    _fanout_requested.set()
+    return True
+
+
+def flush_new_job_notifications():
+    """
+    Run every queued new-job fan-out. A fan-out that fails is logged and not
+    retried. Returns the number of notifications created.
+    """
+    created = 0
+    # One writer at a time, so the shutdown flush doesn't race the thread
+    with _fanout_write_lock:
+        while True:
+            try:
+                job_id, title, company_id = _new_jobs.get_nowait()
+            except queue.Empty:
+                return created
+            try:
+                created += notify_new_job(job_id, title, company_id)
+            except Exception:
+                _count_fanout('failed')
+                logger.exception("Failed to send new job notifications for job %s", job_id)
+                continue
+            _count_fanout('sent')
+
+
+def get_notification_fanout_stats():
+    """Queued, sent, dropped (queue full) and failed new-job fan-outs."""
+    with _fanout_lock:
+        return {'queued': _new_jobs.qsize(), **_fanout_counters}
+
+
+def _fanout_loop():
+    while True:
+        _fanout_requested.wait(NOTIFICATION_FLUSH_INTERVAL)
+        _fanout_requested.clear()
+        flush_new_job_notifications()
+
+
+def start_notification_writer():
+    """Start the background new-job fan-out (once per process) and flush on shutdown."""
+    global _fanout_thread
+    if _fanout_thread is not None:
+        return
+    _fanout_thread = threading.Thread(target=_fanout_loop,
+                                      name="notification-writer", daemon=True)
+    _fanout_thread.start()
+    atexit.register(flush_new_job_notifications)
+
+
+def get_unread_count(user_id):
+    """Unread notifications for a user, served from the cache when possible."""
+    count = _unread_counts.get(user_id)
+    if count is not None:
+        return count
+
+    conn = get_read_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT COUNT(*) FROM notifications WHERE user_id = %s AND is_read = FALSE",
+        (user_id,)
+    )
+    count = cur.fetchone()[0]
+    cur.close()
+    conn.close()
+
+    _unread_counts.set(user_id, count)
+    return count
+
+
+def get_notifications_page(user_id, before_id=None, page_size=NOTIFICATION_PAGE_SIZE):
+    """
+    One page of a user's notifications, newest first.
+    Pass the previous page's 'next_cursor' as before_id for the next page.
+    Returns a dict with 'notifications' and 'next_cursor' (None on the last page).
+    """
+    conn = get_read_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute(
+        f"""
+        SELECT id, type, title, message, link, is_read, created_at
+        FROM notifications
+        WHERE user_id = %s {'AND id < %s' if before_id else ''}
+        ORDER BY id DESC
+        LIMIT %s
+        """,
+        (user_id, before_id, page_size + 1) if before_id else (user_id, page_size + 1)
+    )
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    return {
+        'notifications': rows,
+        'next_cursor': rows[-1]['id'] if has_next else None,
+    }
+
+
+def mark_notifications_read(user_id, notification_ids=None):
+    """
+    Mark the given notifications (or all of them, if None) as read with one
+    UPDATE. Ids that are not the user's are ignored. Returns the number changed.
+    """
+    if notification_ids is not None:
+        notification_ids = sorted({int(nid) for nid in notification_ids})
+        if not notification_ids:
+            return 0
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    if notification_ids is None:
+        cur.execute(
+            "UPDATE notifications SET is_read = TRUE WHERE user_id = %s AND is_read = FALSE",
+            (user_id,)
+        )
+    else:
+        cur.execute(
+            f"""
+            UPDATE notifications SET is_read = TRUE
+            WHERE user_id = %s AND is_read = FALSE
+              AND id IN ({', '.join(['%s'] * len(notification_ids))})
+            """,
+            [user_id] + notification_ids
+        )
+    updated = cur.rowcount
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    if notification_ids is None:
+        _unread_counts.set(user_id, 0)
+    else:
+        _adjust_unread({user_id: -updated})
+    return updated
@@ -0,0 +1,189 @@
+"""
+"Recommended for you" jobs from an in-process inverted index.
+
+The index maps skill keywords (tokenized like models.ranking) to the ids of
+active jobs whose title or requirements mention them. It is built on first
+use, updated when jobs are created or closed in this process, and rebuilt
+every RECOMMENDATION_INDEX_MAX_AGE seconds to pick up changes made by other
+worker processes. Per-student results are cached until the student's
+skills or the index change.
+"""
+import heapq
+import math
+import os
+import threading
+import time
+
+from cache import TTLCache
+from db import get_read_connection
+from models.job import JOB_LISTING_COLUMNS, JOB_VISIBLE_CONDITIONS
+from models.ranking import tokenize
+
+RECOMMENDATION_INDEX_MAX_AGE = float(os.environ.get("RECOMMENDATION_INDEX_MAX_AGE", 300))
+
+_index = {}          # token -> set of job ids
+_job_terms = {}      # job id -> set of tokens
+_index_version = 0
+_index_built_at = None
+_pending_changes = None  # jobs added/removed while a rebuild reads the database
+_index_lock = threading.RLock()
+_rebuild_lock = threading.Lock()
+
+_recommendation_cache = TTLCache(maxsize=20000, ttl=RECOMMENDATION_INDEX_MAX_AGE)
+
+
+def _job_tokens(title, requirements):
+    return set(tokenize(title)) | set(tokenize(requirements))
+
+
+def _add(job_id, terms):
+    _job_terms[job_id] = terms
+    for term in terms:
+        _index.setdefault(term, set()).add(job_id)
+
+
+def _remove(job_id):
+    for term in _job_terms.pop(job_id, ()):
+        job_ids = _index.get(term)
+        if job_ids is not None:
+            job_ids.discard(job_id)
+            if not job_ids:
+                del _index[term]
+
+
+def rebuild_index():
+    """
+    Rebuild the index from all active jobs. Jobs indexed or unindexed while
+    the rows are read are replayed onto the new index before it is swapped in.
+    """
+    global _index, _job_terms, _index_version, _index_built_at, _pending_changes
+    with _index_lock:
+        _pending_changes = []
+    try:
+        conn = get_read_connection()
+        cur = conn.cursor(buffered=False)
+        try:
+            cur.execute("SELECT id, title, requirements FROM jobs WHERE status = 'active'")
+            index, job_terms = {}, {}
+            for job_id, title, requirements in cur:
+                terms = _job_tokens(title, requirements)
+                job_terms[job_id] = terms
+                for term in terms:
+                    index.setdefault(term, set()).add(job_id)
+        finally:
+            cur.close()
+            conn.close()
+
+        with _index_lock:
+            _index, _job_terms = index, job_terms
+            for job_id, terms in _pending_changes:
+                _remove(job_id)
+                if terms is not None:
+                    _add(job_id, terms)
+            _index_version += 1
+            _index_built_at = time.monotonic()
+    finally:
+        with _index_lock:
+            _pending_changes = None
+
+
+def _ensure_index():
+    if _index_built_at is None:
+        with _rebuild_lock:
+            if _index_built_at is None:
+                rebuild_index()
+    elif time.monotonic() - _index_built_at > RECOMMENDATION_INDEX_MAX_AGE:
+        # One thread refreshes; the others keep serving the current index
+        if _rebuild_lock.acquire(blocking=False):
+            try:
+                rebuild_index()
+            finally:
+                _rebuild_lock.release()
+
+
+def index_job(job_id, title, requirements):
+    """Add or refresh one job (called when a job is created)."""
+    global _index_version
+    with _index_lock:
+        terms = _job_tokens(title, requirements)
+        if _pending_changes is not None:
+            _pending_changes.append((job_id, terms))
+        if _index_built_at is None:
+            return  # Built lazily from the database on first use
+        _remove(job_id)
+        _add(job_id, terms)
+        _index_version += 1
+
+
+def unindex_jobs(job_ids):
+    """Drop jobs from the index (called when jobs close)."""
+    global _index_version
+    with _index_lock:
+        if _pending_changes is not None:
+            _pending_changes.extend((job_id, None) for job_id in job_ids)
+        if _index_built_at is None:
+            return
+        for job_id in job_ids:
+            _remove(job_id)
+        _index_version += 1
+
+
+def _score_jobs(skills, k):
+    """Top-k (job_id, score) by summed IDF of matching skill keywords."""
+    with _index_lock:
+        total = max(len(_job_terms), 1)
+        scores = {}
+        for term in set(tokenize(skills)):
+            job_ids = _index.get(term)
+            if not job_ids:
+                continue
+            idf = math.log(1 + total / len(job_ids))
+            for job_id in job_ids:
+                scores[job_id] = scores.get(job_id, 0.0) + idf
+        # Favor jobs where the match covers more of what they ask for
+        ranked = ((score / math.sqrt(len(_job_terms[job_id])), job_id)
+                  for job_id, score in scores.items())
+        return [(job_id, score) for score, job_id in heapq.nlargest(k, ranked)]
+
+
+def get_recommended_jobs(student_id, skills, k=5):
+    """
+    Top-k visible jobs matching a student's skills, best first.
+    Each job dict has the job board listing columns plus 'match_score'.
+    """
+    if not skills:
+        return []
+
+    _ensure_index()
+    cached = _recommendation_cache.get(student_id)
+    if cached is not None and cached[0] == _index_version and cached[1] == skills:
+        return cached[2]
+    version = _index_version
+
+    # Over-fetch: some candidates may have passed their deadline or filled up
+    candidates = _score_jobs(skills, k * 3)
+    jobs = []
+    if candidates:
+        scores = dict(candidates)
+        conn = get_read_connection()
+        cur = conn.cursor(dictionary=True)
+        cur.execute(
+            f"""
+            SELECT {JOB_LISTING_COLUMNS}
+            FROM jobs j
+            INNER JOIN companies c ON j.company_id = c.id
+            WHERE j.id IN ({', '.join(['%s'] * len(scores))})
+              AND {JOB_VISIBLE_CONDITIONS}
+            """,
+            list(scores)
+        )
+        rows = cur.fetchall()
+        cur.close()
+        conn.close()
+
+        for row in rows:
+            row['match_score'] = round(scores[row['id']], 3)
+        jobs = sorted(rows, key=lambda row: row['match_score'], reverse=True)[:k]
+
+    _recommendation_cache.set(student_id, (version, skills, jobs))
+    return jobs
@@ -0,0 +1,104 @@
+"""
+System statistics for the admin dashboard.
+
+The counters are computed with one pass per table in a single query and kept
+as an in-process snapshot. Models adjust the snapshot as rows are created, and
+it is recomputed from the database once it is older than ADMIN_STATS_MAX_AGE
+seconds, which also corrects any drift from other worker processes.
+"""
+import os
+import threading
+import time
+
+from db import get_read_connection
+
+ADMIN_STATS_MAX_AGE = float(os.environ.get("ADMIN_STATS_MAX_AGE", 60))
+
+ADMIN_STAT_KEYS = (
+    "total_students",
+    "total_companies",
+    "total_jobs",
+    "active_jobs",
+    "total_applications",
+    "pending_applications",
+    "accepted_applications",
+    "total_users",
+    "active_users",
+)
+
+_snapshot = None
+_snapshot_at = 0.0
+_snapshot_lock = threading.Lock()
+
+
+# One derived table per base table; compute_admin_stats() cross joins them so
+# everything comes back in one round trip.
+ADMIN_STAT_QUERIES = {
+    "students": "SELECT COUNT(*) AS total_students FROM students",
+    "companies": "SELECT COUNT(*) AS total_companies FROM companies",
+    "jobs": """SELECT COUNT(*) AS total_jobs,
+                      COALESCE(SUM(status = 'active'), 0) AS active_jobs
+               FROM jobs""",
+    "applications": """SELECT COUNT(*) AS total_applications,
+                              COALESCE(SUM(status = 'pending'), 0) AS pending_applications,
+                              COALESCE(SUM(status = 'accepted'), 0) AS accepted_applications
+                       FROM applications""",
+    "users": """SELECT COUNT(*) AS total_users,
+                       COALESCE(SUM(is_active = TRUE), 0) AS active_users
+                FROM users""",
+}
+
+
+def compute_admin_stats():
+    """Count everything the admin dashboard shows in one round trip."""
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    cursor.execute(
+        "SELECT * FROM " + ",\n".join(
+            f"({query}) {table}_counts" for table, query in ADMIN_STAT_QUERIES.items()
+        )
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    conn.close()
+
+    return {key: int(row[key] or 0) for key in ADMIN_STAT_KEYS}
+
+
+def get_admin_stats(max_age=None):
+    """
+    Return the cached statistics snapshot, recomputing it when it is older
+    than max_age seconds (ADMIN_STATS_MAX_AGE by default).
+    """
+    global _snapshot, _snapshot_at
+    max_age = ADMIN_STATS_MAX_AGE if max_age is None else max_age
+
+    with _snapshot_lock:
+        if _snapshot is not None and time.monotonic() - _snapshot_at <= max_age:
+            return dict(_snapshot)
+
+    stats = compute_admin_stats()
+    with _snapshot_lock:
+        _snapshot = stats
+        _snapshot_at = time.monotonic()
+    return dict(stats)
+
+
+def adjust_admin_stats(**deltas):
+    """
+    Apply counter changes to the snapshot, e.g. adjust_admin_stats(total_jobs=1).
+    Does nothing until a snapshot has been computed.
+    """
+    with _snapshot_lock:
+        if _snapshot is None:
+            return
+        for key, delta in deltas.items():
+            _snapshot[key] = _snapshot.get(key, 0) + delta
+
+
+def invalidate_admin_stats():
+    """Force the next get_admin_stats() call to recompute."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
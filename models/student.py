@@ -1,9 +1,12 @@
-from db import get_db_connection
+from db import get_db_connection, get_read_connection
+from models.stats import adjust_admin_stats
+from models.user import invalidate_identity
+from models.activity_log import log_activity
 
 # get user_id of logged user by username
 
 def get_student_id_by_user_id(user_id):
-    conn = get_db_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True)
 
     cursor.execute(
@@ -20,24 +23,27 @@ def get_student_id_by_user_id(user_id):
 
 # To save the data of student
 
+def _profile_complete_sql(column):
+    """
+    SQL for is_profile_complete: name, email and course filled in and a
+    positive CGPA. column(name) renders the expression for each field.
+    """
+    return ("(" + " AND ".join(f"COALESCE({column(field)}, '') <> ''" for field in ('name', 'email', 'course'))
+            + f" AND COALESCE({column('cgpa')}, 0) > 0)")
+
+
 def save_student_profile(user_id, name=None, email=None, course=None, cgpa=None, 
                         phone=None, year_of_study=None, skills=None, bio=None,
                         resume_url=None, linkedin_url=None, github_url=None):
     """
     Save or update student profile with all available fields.
     Only updates fields that are provided (not None).
+
+    One INSERT ... ON DUPLICATE KEY UPDATE on the unique user_id, so there is
+    no read first and concurrent first saves can't create two profiles.
+    is_profile_complete is computed from the merged row. When nothing
+    changes MySQL leaves the row alone, and no activity is logged.
     """
-    conn = get_db_connection()
-    cur = conn.cursor(dictionary=True)
-    
-    # Get existing profile to merge with new data
-    cur.execute("SELECT * FROM students WHERE user_id = %s", (user_id,))
-    existing = cur.fetchone()
-    
-    # Prepare update values
-    update_fields = []
-    values = []
-    
     fields_map = {
         'name': name,
         'email': email,
@@ -51,52 +57,51 @@ def save_student_profile(user_id, name=None, email=None, course=None, cgpa=None,
         'linkedin_url': linkedin_url,
         'github_url': github_url
     }
-    
-    for field, value in fields_map.items():
-        if value is not None:
-            update_fields.append(f"{field} = %s")
-            values.append(value)
-    
-    # Check if profile is complete
-    is_complete = bool(name and email and course and cgpa)
-    if is_complete:
-        update_fields.append("is_profile_complete = TRUE")
-    
-    if existing:
-        # Update existing profile
-        if update_fields:
-            values.append(user_id)
-            query = f"""
-                UPDATE students 
-                SET {', '.join(update_fields)}
-                WHERE user_id = %s
-            """
-            cur.execute(query, values)
-    else:
-        # Insert new profile
-        insert_fields = ['user_id'] + [k for k, v in fields_map.items() if v is not None]
-        if is_complete:
-            insert_fields.append('is_profile_complete')
-        
-        insert_values = [user_id] + [v for v in fields_map.values() if v is not None]
-        if is_complete:
-            insert_values.append(True)
-        
-        placeholders = ', '.join(['%s'] * len(insert_values))
-        query = f"""
-            INSERT INTO students ({', '.join(insert_fields)})
-            VALUES ({placeholders})
-        """
-        cur.execute(query, insert_values)
+    fields = [field for field, value in fields_map.items() if value is not None]
 
-    conn.commit()
-    cur.close()
-    conn.close()
+    # In VALUES, is_profile_complete sees the columns listed before it (the
+    # others are still NULL); on update, fields not given keep their stored
+    # values. id = LAST_INSERT_ID(id) makes lastrowid the existing id on update.
+    query = f"""
+        INSERT INTO students (user_id{''.join(f', {field}' for field in fields)}, is_profile_complete)
+        VALUES (%s{', %s' * len(fields)}, {_profile_complete_sql(lambda field: field)})
+        ON DUPLICATE KEY UPDATE
+            id = LAST_INSERT_ID(id){''.join(f', {field} = VALUES({field})' for field in fields)},
+            is_profile_complete = {_profile_complete_sql(
+                lambda field: f'VALUES({field})' if field in fields else field)}
+    """
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(query, [user_id] + [fields_map[field] for field in fields])
+        # Affected rows: 1 inserted, 2 updated, 0 unchanged
+        outcome, student_id = cur.rowcount, cur.lastrowid
+        if outcome:
+            conn.commit()
+        else:
+            conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    if not outcome:
+        return
+
+    log_activity('student_profile_created' if outcome == 1 else 'student_profile_updated',
+                 'student', student_id, {'fields': fields}, user_id=user_id)
+
+    if outcome == 1:
+        adjust_admin_stats(total_students=1)
+        invalidate_identity(user_id)
 
 # To show student profile details
 
 def get_student_profile(user_id):
-    conn = get_db_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True,buffered=True)
     
     cursor.execute(
@@ -108,4 +113,53 @@ def get_student_profile(user_id):
     cursor.close()
     conn.close()
     
-    return profile
\ No newline at end of file
+    return profile
+
+
+# Dashboard data: profile + application counts + active job count
+
+DASHBOARD_STAT_KEYS = (
+    'total_applications',
+    'pending_applications',
+    'shortlisted_applications',
+    'accepted_applications',
+    'rejected_applications',
+    'active_jobs',
+)
+
+def get_student_dashboard_data(user_id):
+    """
+    Load everything the student dashboard shows in one round trip.
+
+    Counts are aggregated in SQL (as in sp_get_student_app_stats) so no
+    application or job rows are fetched. Returns (profile, stats); profile is
+    None when the student has no profile yet.
+    """
+    conn = get_read_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    cursor.execute(
+        """
+        SELECT
+            s.*,
+            COUNT(a.id) AS total_applications,
+            COALESCE(SUM(a.status = 'pending'), 0) AS pending_applications,
+            COALESCE(SUM(a.status = 'shortlisted'), 0) AS shortlisted_applications,
+            COALESCE(SUM(a.status = 'accepted'), 0) AS accepted_applications,
+            COALESCE(SUM(a.status = 'rejected'), 0) AS rejected_applications,
+            aj.active_jobs
+        FROM (SELECT COUNT(*) AS active_jobs FROM jobs WHERE status = 'active') aj
+        LEFT JOIN students s ON s.user_id = %s
+        LEFT JOIN applications a ON a.student_id = s.id
+        GROUP BY aj.active_jobs, s.id
+        """,
+        (user_id,)
+    )
+
+    row = cursor.fetchone()
+    cursor.close()
+    conn.close()
+
+    stats = {key: int(row.pop(key) or 0) for key in DASHBOARD_STAT_KEYS}
+    profile = row if row['id'] is not None else None
+    return profile, stats
@@ -0,0 +1,203 @@
+"""
+Bulk student onboarding from CSV.
+
+The file is read as a stream and processed in batches: rows are validated,
+their passwords hashed in parallel, and each batch's users and students are
+written with two multi-row INSERTs in one transaction. Bad rows are reported
+with their line number and skipped; they never abort the rest of the file.
+
+Expected columns (header row required):
+    username, email, password          - required
+    name, course, cgpa, phone, year_of_study, skills - optional
+"""
+import csv
+
+from auth.auth import (
+    hash_passwords,
+    validate_email,
+    validate_username,
+    validate_password_strength_medium,
+    sanitize_input
+)
+from db import get_db_connection
+from models.stats import adjust_admin_stats
+
+IMPORT_BATCH_SIZE = 500
+
+REQUIRED_COLUMNS = ('username', 'email', 'password')
+PROFILE_COLUMNS = ('name', 'course', 'cgpa', 'phone', 'year_of_study', 'skills')
+
+
+def _parse_row(row):
+    """Validate one CSV row. Returns (record, None) or (None, error message)."""
+    username = sanitize_input((row.get('username') or '').strip(), max_length=30)
+    email = sanitize_input((row.get('email') or '').strip(), max_length=255).lower()
+    password = row.get('password') or ''
+
+    valid, message = validate_username(username)
+    if not valid:
+        return None, message
+    if not validate_email(email):
+        return None, "Invalid email address"
+    valid, message = validate_password_strength_medium(password)
+    if not valid:
+        return None, message
+
+    record = {'username': username, 'email': email, 'password': password}
+    for column in PROFILE_COLUMNS:
+        value = sanitize_input((row.get(column) or '').strip(), max_length=255 if column != 'skills' else None)
+        record[column] = value or None
+
+    try:
+        if record['cgpa'] is not None:
+            record['cgpa'] = float(record['cgpa'])
+            if not 0 <= record['cgpa'] <= 10:
+                return None, "CGPA must be between 0 and 10"
+        if record['year_of_study'] is not None:
+            record['year_of_study'] = int(record['year_of_study'])
+    except ValueError:
+        return None, "CGPA and year of study must be numbers"
+
+    return record, None
+
+
+def _find_existing(cur, records):
+    """Emails and usernames from this batch that are already registered."""
+    emails = [r['email'] for r in records]
+    usernames = [r['username'] for r in records]
+    cur.execute(
+        f"""
+        SELECT email, username FROM users
+        WHERE email IN ({', '.join(['%s'] * len(emails))})
+           OR username IN ({', '.join(['%s'] * len(usernames))})
+        """,
+        emails + usernames
+    )
+    rows = cur.fetchall()
+    return {row[0].lower() for row in rows}, {row[1] for row in rows}
+
+
+def _insert_batch(conn, records):
+    """Insert users and student profiles for a batch in one transaction."""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"""
+            INSERT INTO users (username, email, password, role)
+            VALUES {', '.join(["(%s, %s, %s, 'student')"] * len(records))}
+            """,
+            [v for r in records for v in (r['username'], r['email'], r['password_hash'])]
+        )
+
+        # Auto-increment ids are not guaranteed to be consecutive, so look them up
+        cur.execute(
+            f"SELECT id, email FROM users WHERE email IN ({', '.join(['%s'] * len(records))})",
+            [r['email'] for r in records]
+        )
+        user_ids = {email.lower(): user_id for user_id, email in cur.fetchall()}
+
+        values = []
+        for r in records:
+            is_complete = bool(r['name'] and r['email'] and r['course'] and r['cgpa'])
+            values += [user_ids[r['email']], r['name'], r['email'], r['course'], r['cgpa'],
+                       r['phone'], r['year_of_study'], r['skills'], is_complete]
+        cur.execute(
+            f"""
+            INSERT INTO students (user_id, name, email, course, cgpa, phone,
+                                  year_of_study, skills, is_profile_complete)
+            VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(records))}
+            """,
+            values
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def _process_batch(conn, batch, report):
+    """batch is a list of (line_number, record)."""
+    cur = conn.cursor()
+    existing_emails, existing_usernames = _find_existing(cur, [r for _, r in batch])
+    cur.close()
+
+    pending = []
+    for line, record in batch:
+        if record['email'] in existing_emails:
+            report['errors'].append((line, f"Email {record['email']} is already registered"))
+        elif record['username'] in existing_usernames:
+            report['errors'].append((line, f"Username {record['username']} is already taken"))
+        else:
+            pending.append((line, record))
+    if not pending:
+        return
+
+    hashes = hash_passwords([record['password'] for _, record in pending])
+    for (_, record), password_hash in zip(pending, hashes):
+        record['password_hash'] = password_hash
+
+    try:
+        _insert_batch(conn, [record for _, record in pending])
+        report['imported'] += len(pending)
+    except Exception:
+        # Something in the batch conflicted (e.g. a concurrent registration);
+        # retry row by row so only the offending rows are reported
+        for line, record in pending:
+            try:
+                _insert_batch(conn, [record])
+                report['imported'] += 1
+            except Exception as e:
+                report['errors'].append((line, str(e)))
+
+
+def import_students_csv(stream, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import students from a CSV text stream.
+
+    Returns a dict with 'rows' (data rows read), 'imported' and 'errors',
+    a list of (line number, message) for every row that was skipped.
+    """
+    report = {'rows': 0, 'imported': 0, 'errors': []}
+    reader = csv.DictReader(stream)
+
+    fieldnames = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [column for column in REQUIRED_COLUMNS if column not in fieldnames]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    reader.fieldnames = fieldnames
+
+    conn = get_db_connection()
+    seen_emails, seen_usernames = set(), set()
+    batch = []
+
+    try:
+        for row in reader:
+            report['rows'] += 1
+            line = reader.line_num
+            record, error = _parse_row(row)
+            if error:
+                report['errors'].append((line, error))
+                continue
+            if record['email'] in seen_emails or record['username'] in seen_usernames:
+                report['errors'].append((line, "Duplicate email or username earlier in the file"))
+                continue
+            seen_emails.add(record['email'])
+            seen_usernames.add(record['username'])
+
+            batch.append((line, record))
+            if len(batch) >= batch_size:
+                _process_batch(conn, batch, report)
+                batch = []
+
+        if batch:
+            _process_batch(conn, batch, report)
+    finally:
+        conn.close()
+        if report['imported']:
+            adjust_admin_stats(total_users=report['imported'],
+                               active_users=report['imported'],
+                               total_students=report['imported'])
+
+    return report
@@ -1,5 +1,12 @@
-from db import get_db_connection
+import logging
+import os
+import threading
+import time
+
+from cache import TTLCache
+from db import bump_cache_version, get_db_connection, get_read_connection, read_cache_version
 from auth.auth import hash_password
+from models.stats import adjust_admin_stats
 
 def get_user_by_email(email):
     conn = get_db_connection()
@@ -12,7 +19,7 @@ def get_user_by_email(email):
 
 def get_user_by_id(user_id):
     """Get user by ID"""
-    conn = get_db_connection()
+    conn = get_read_connection()
     cursor = conn.cursor(dictionary=True, buffered=True)
     cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
     user = cursor.fetchone()
@@ -21,6 +28,136 @@ def get_user_by_id(user_id):
     return user
 
 
+# -------------------- IDENTITY --------------------
+# The user's role, active flag and student/company id, resolved with one query
+# and cached for IDENTITY_CACHE_TTL seconds. Activating or deactivating an
+# account bumps the 'users' row of cache_versions; every process checks it at
+# most every IDENTITY_VERSION_REFRESH seconds and drops its cached identities
+# when it moved, so a deactivated user is signed out everywhere within that.
+# A student or company without a profile row yet is not cached, so the
+# profile id shows up on the next request after the profile is saved.
+
+IDENTITY_CACHE_TTL = float(os.environ.get("IDENTITY_CACHE_TTL", 30))
+IDENTITY_VERSION_REFRESH = float(os.environ.get("IDENTITY_VERSION_REFRESH", 2))
+
+logger = logging.getLogger(__name__)
+
+_identity_cache = TTLCache(maxsize=10000, ttl=IDENTITY_CACHE_TTL)
+_users_version = None
+_users_checked_at = None
+_users_refresh_lock = threading.Lock()
+
+
+def _check_users_version():
+    """Drop every cached identity if another process changed an account's status."""
+    global _users_version, _users_checked_at
+    now = time.monotonic()
+    if _users_checked_at is not None and now - _users_checked_at < IDENTITY_VERSION_REFRESH:
+        return
+    # One thread refreshes; the others use the cache as it is
+    if not _users_refresh_lock.acquire(blocking=False):
+        return
+    try:
+        _users_checked_at = now
+        shared = read_cache_version('users')
+        if shared != _users_version:
+            _identity_cache.clear()
+            _users_version = shared
+    except Exception:
+        logger.debug("Could not read the shared users version", exc_info=True)
+    finally:
+        _users_refresh_lock.release()
+
+
+def get_identity(user_id):
+    """
+    Returns a dict with id, role, is_active, student_id and company_id,
+    or None if the user does not exist.
+    """
+    _check_users_version()
+    identity = _identity_cache.get(user_id)
+    if identity is not None:
+        return identity
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    cursor.execute(
+        """
+        SELECT u.id, u.role, u.is_active,
+               s.id AS student_id,
+               c.id AS company_id
+        FROM users u
+        LEFT JOIN students s ON s.user_id = u.id
+        LEFT JOIN companies c ON c.user_id = u.id
+        WHERE u.id = %s
+        """,
+        (user_id,)
+    )
+    identity = cursor.fetchone()
+    cursor.close()
+    conn.close()
+
+    if identity:
+        identity["role"] = identity["role"].strip().lower()
+        identity["is_active"] = bool(identity["is_active"]) if identity["is_active"] is not None else True
+        missing_profile = (
+            (identity["role"] == "student" and identity["student_id"] is None)
+            or (identity["role"] == "company" and identity["company_id"] is None)
+        )
+        if not missing_profile:
+            _identity_cache.set(user_id, identity)
+    return identity
+
+
+def invalidate_identity(user_id):
+    _identity_cache.delete(user_id)
+
+
+def set_user_active(user_id, is_active):
+    """
+    Activate or deactivate an account. Takes effect on the user's next request
+    in this process, and in other processes within IDENTITY_VERSION_REFRESH
+    seconds. Returns False if the account was already in that state.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE users SET is_active = %s WHERE id = %s AND COALESCE(is_active, TRUE) <> %s",
+        (is_active, user_id, is_active)
+    )
+    changed = cursor.rowcount > 0
+    if changed:
+        bump_cache_version(cursor, 'users')
+    conn.commit()
+    cursor.close()
+    conn.close()
+    invalidate_identity(user_id)
+    if changed:
+        adjust_admin_stats(active_users=1 if is_active else -1)
+    return changed
+
+
+def record_login(user_id, password_hash=None):
+    """
+    Update last_login, and store an upgraded password hash if one is given.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    if password_hash:
+        cursor.execute(
+            "UPDATE users SET last_login = CURRENT_TIMESTAMP, password = %s WHERE id = %s",
+            (password_hash, user_id)
+        )
+    else:
+        cursor.execute(
+            "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s",
+            (user_id,)
+        )
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
 def create_user(username, email, password_hash, role):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -32,6 +169,7 @@ def create_user(username, email, password_hash, role):
     user_id = cursor.lastrowid
     cursor.close()
     conn.close()
+    adjust_admin_stats(total_users=1, active_users=1)
     return user_id
 
 
@@ -0,0 +1,222 @@
+"""
+Per-request SQL profiling.
+
+While a request is being handled, every cursor from db.get_db_connection()
+is wrapped so each statement's normalized text, time (execute plus fetch)
+and rows returned are recorded. When the request ends the statements are
+checked for:
+    repeated - the same statement with the same parameters run more than once
+    N+1      - the same statement shape run SQL_PROFILER_NPLUSONE_THRESHOLD or
+               more times with different parameters (a query inside a loop)
+Requests slower than SQL_PROFILER_SLOW_REQUEST_MS, or with either problem,
+are logged and kept for the admin diagnostics page, along with totals per
+statement. Set SQL_PROFILER=0 to turn it off.
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from flask import current_app, g, has_app_context, request
+
+SQL_PROFILER_ENABLED = os.environ.get("SQL_PROFILER", "1") == "1"
+SQL_PROFILER_SLOW_REQUEST_MS = float(os.environ.get("SQL_PROFILER_SLOW_REQUEST_MS", 500))
+SQL_PROFILER_NPLUSONE_THRESHOLD = int(os.environ.get("SQL_PROFILER_NPLUSONE_THRESHOLD", 3))
+SQL_PROFILER_MAX_STATEMENTS = 500    # distinct statements tracked in the totals
+SQL_PROFILER_RECENT_REQUESTS = 50    # flagged requests kept for the diagnostics page
+
+_statement_totals = {}
+_flagged_requests = deque(maxlen=SQL_PROFILER_RECENT_REQUESTS)
+_totals = {'requests': 0, 'statements': 0, 'flagged_requests': 0}
+_lock = threading.Lock()
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Statement shape: literals and placeholders become ?, IN lists collapse to (...)."""
+    if isinstance(sql, bytes):
+        sql = sql.decode(errors="replace")
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql.replace("%s", "?"))
+    sql = _VALUES_LIST.sub("(...)", _PLACEHOLDER_LIST.sub("(...)", sql))
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class ProfiledCursor:
+    """Cursor proxy that records each statement into the request's profile."""
+
+    def __init__(self, cursor, profile):
+        self._cursor = cursor
+        self._profile = profile
+        self._current = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return self._counted(iter(self._cursor))
+
+    def _counted(self, rows):
+        for row in rows:
+            self._current['rows'] += 1
+            yield row
+
+    def _record(self, operation, params, run):
+        start = time.perf_counter()
+        try:
+            return run()
+        finally:
+            self._current = {
+                'sql': normalize_sql(operation),
+                'params': repr(params),
+                'time': time.perf_counter() - start,
+                'rows': 0,
+            }
+            self._profile.append(self._current)
+
+    def _fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        if self._current is not None:
+            self._current['time'] += time.perf_counter() - start
+            if isinstance(result, list):
+                self._current['rows'] += len(result)
+            elif result is not None:
+                self._current['rows'] += 1
+        return result
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._record(operation, params,
+                            lambda: self._cursor.execute(operation, params, *args, **kwargs))
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._record(operation, f"<{len(seq_params)} rows>",
+                            lambda: self._cursor.executemany(operation, seq_params, *args, **kwargs))
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch(lambda: self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+
+def profile_cursor(cursor):
+    """
+    Wrap a cursor if the current request is being profiled. Worker threads
+    reading on a request's behalf (models.async_data) share its profile.
+    """
+    if has_app_context():
+        profile = g.get("sql_profile")
+        if profile is not None:
+            return ProfiledCursor(cursor, profile)
+    return cursor
+
+
+def _start_request():
+    g.sql_profile = []
+    g.sql_profile_started = time.perf_counter()
+
+
+def _analyze(statements):
+    by_shape, by_call = {}, {}
+    for statement in statements:
+        by_shape.setdefault(statement['sql'], set()).add(statement['params'])
+        call = (statement['sql'], statement['params'])
+        by_call[call] = by_call.get(call, 0) + 1
+
+    repeated = [{'sql': sql, 'count': count}
+                for (sql, _), count in by_call.items() if count > 1]
+    n_plus_one = [{'sql': sql, 'count': sum(by_call[(sql, p)] for p in params)}
+                  for sql, params in by_shape.items()
+                  if len(params) >= SQL_PROFILER_NPLUSONE_THRESHOLD]
+    return repeated, n_plus_one
+
+
+def _finish_request(exception=None):
+    statements = g.pop("sql_profile", None)
+    started = g.pop("sql_profile_started", None)
+    if statements is None:
+        return
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    repeated, n_plus_one = _analyze(statements)
+    flagged = bool(repeated or n_plus_one or elapsed_ms > SQL_PROFILER_SLOW_REQUEST_MS)
+
+    with _lock:
+        _totals['requests'] += 1
+        _totals['statements'] += len(statements)
+        for statement in statements:
+            totals = _statement_totals.get(statement['sql'])
+            if totals is None:
+                if len(_statement_totals) >= SQL_PROFILER_MAX_STATEMENTS:
+                    continue
+                totals = _statement_totals[statement['sql']] = {
+                    'sql': statement['sql'], 'count': 0, 'total_time': 0.0,
+                    'max_time': 0.0, 'rows': 0,
+                }
+            totals['count'] += 1
+            totals['total_time'] += statement['time']
+            totals['max_time'] = max(totals['max_time'], statement['time'])
+            totals['rows'] += statement['rows']
+
+        if flagged:
+            _totals['flagged_requests'] += 1
+            _flagged_requests.appendleft({
+                'method': request.method,
+                'path': request.full_path.rstrip('?'),
+                'endpoint': request.endpoint,
+                'elapsed_ms': elapsed_ms,
+                'statements': len(statements),
+                'sql_ms': sum(s['time'] for s in statements) * 1000,
+                'repeated': repeated,
+                'n_plus_one': n_plus_one,
+                'at': time.time(),
+            })
+
+    if flagged:
+        current_app.logger.warning(
+            "%s %s took %.0f ms with %d SQL statements (%d repeated, %d N+1 suspects)",
+            request.method, request.path, elapsed_ms, len(statements),
+            len(repeated), len(n_plus_one)
+        )
+
+
+def get_profiler_report(limit=20):
+    """Totals, the top statements by total time, and recent flagged requests."""
+    with _lock:
+        top = sorted(_statement_totals.values(), key=lambda s: s['total_time'], reverse=True)[:limit]
+        return {
+            **_totals,
+            'enabled': SQL_PROFILER_ENABLED,
+            'top_statements': [
+                {**s, 'avg_time': s['total_time'] / s['count']} for s in top
+            ],
+            'flagged': list(_flagged_requests),
+        }
+
+
+def reset_profiler():
+    with _lock:
+        _statement_totals.clear()
+        _flagged_requests.clear()
+        for key in _totals:
+            _totals[key] = 0
+
+
+def init_profiler(app):
+    """Profile every request of the app (unless SQL_PROFILER=0)."""
+    if not SQL_PROFILER_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.teardown_request(_finish_request)
@@ -1,6 +1,15 @@
-from flask import Blueprint, render_template, flash
+import io
+
+from flask import Blueprint, render_template, flash, jsonify, request, redirect, url_for, session
 from routes.decorators import login_required, role_required
-from db import get_db_connection
+from db import get_pool_stats, get_routing_stats
+from models.activity_log import get_activity_log_stats, log_activity
+from models.job import get_job_sweep_stats, get_job_view_stats
+from models.notification import get_notification_fanout_stats
+from profiler import get_profiler_report, reset_profiler
+from models.stats import get_admin_stats, ADMIN_STAT_KEYS
+from models.student_import import import_students_csv
+from models.user import get_user_by_email, set_user_active
 
 admin_routes = Blueprint('admin_routes', __name__)
 
@@ -10,69 +19,143 @@ admin_routes = Blueprint('admin_routes', __name__)
 def admin_dashboard():
     """
     Admin dashboard with system statistics.
+    Served from the cached snapshot in models.stats (see ADMIN_STATS_MAX_AGE).
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Get total students
-        cursor.execute("SELECT COUNT(*) as count FROM students")
-        total_students = cursor.fetchone()['count']
-        
-        # Get total companies
-        cursor.execute("SELECT COUNT(*) as count FROM companies")
-        total_companies = cursor.fetchone()['count']
-        
-        # Get total jobs
-        cursor.execute("SELECT COUNT(*) as count FROM jobs")
-        total_jobs = cursor.fetchone()['count']
-        
-        # Get active jobs
-        cursor.execute("SELECT COUNT(*) as count FROM jobs WHERE status = 'active'")
-        active_jobs = cursor.fetchone()['count']
-        
-        # Get total applications
-        cursor.execute("SELECT COUNT(*) as count FROM applications")
-        total_applications = cursor.fetchone()['count']
-        
-        # Get pending applications
-        cursor.execute("SELECT COUNT(*) as count FROM applications WHERE status = 'pending'")
-        pending_applications = cursor.fetchone()['count']
-        
-        # Get accepted applications
-        cursor.execute("SELECT COUNT(*) as count FROM applications WHERE status = 'accepted'")
-        accepted_applications = cursor.fetchone()['count']
-        
-        # Get total users
-        cursor.execute("SELECT COUNT(*) as count FROM users")
-        total_users = cursor.fetchone()['count']
-        
-        # Get active users
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE is_active = TRUE")
-        active_users = cursor.fetchone()['count']
-        
-        cursor.close()
-        conn.close()
-        
-        return render_template("admin_dashboard.html",
-                             total_students=total_students,
-                             total_companies=total_companies,
-                             total_jobs=total_jobs,
-                             active_jobs=active_jobs,
-                             total_applications=total_applications,
-                             pending_applications=pending_applications,
-                             accepted_applications=accepted_applications,
-                             total_users=total_users,
-                             active_users=active_users)
+        stats = get_admin_stats()
+        return render_template("admin_dashboard.html", **stats)
     except Exception as e:
         flash(f"Error loading dashboard statistics: {str(e)}", "error")
         return render_template("admin_dashboard.html",
-                             total_students=0,
-                             total_companies=0,
-                             total_jobs=0,
-                             active_jobs=0,
-                             total_applications=0,
-                             pending_applications=0,
-                             accepted_applications=0,
-                             total_users=0,
-                             active_users=0)
+                             **{key: 0 for key in ADMIN_STAT_KEYS})
+
+
+@admin_routes.route("/admin/import-students", methods=["GET", "POST"])
+@login_required
+@role_required("admin")
+def import_students():
+    """
+    Bulk onboarding: upload a CSV of students and show a per-row report.
+    """
+    report = None
+    if request.method == "POST":
+        upload = request.files.get("csv_file")
+        if not upload or not upload.filename:
+            flash("Please choose a CSV file to upload.", "error")
+        else:
+            try:
+                # Decode the upload as a stream rather than reading it into memory
+                stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+                report = import_students_csv(stream)
+                flash(f"Imported {report['imported']} of {report['rows']} students.", "success")
+            except ValueError as e:
+                flash(f"Invalid file: {str(e)}", "error")
+            except Exception as e:
+                flash(f"An error occurred during import: {str(e)}", "error")
+
+    return render_template("admin_import_students.html", report=report)
+
+
+@admin_routes.route("/admin/users/active", methods=["POST"])
+@login_required
+@role_required("admin")
+def set_account_active():
+    """
+    Activate or deactivate an account by email. A deactivated user is signed
+    out within IDENTITY_VERSION_REFRESH seconds on every app process.
+    """
+    email = request.form.get("email", "").strip()
+    is_active = request.form.get("action") == "activate"
+    user = get_user_by_email(email) if email else None
+
+    if not user:
+        flash("No account found with that email.", "error")
+    elif user["id"] == session["user_id"]:
+        flash("You cannot change the status of your own account.", "error")
+    elif set_user_active(user["id"], is_active):
+        log_activity("activate_user" if is_active else "deactivate_user",
+                     entity_type="user", entity_id=user["id"])
+        flash(f"{email} has been {'activated' if is_active else 'deactivated'}.", "success")
+    else:
+        flash(f"{email} is already {'active' if is_active else 'inactive'}.", "info")
+    return redirect(url_for("admin_routes.admin_dashboard"))
+
+
+@admin_routes.route("/admin/pool-stats")
+@login_required
+@role_required("admin")
+def pool_stats():
+    """
+    Connection pool statistics (checked-out, wait time, timeouts) for sizing the pool.
+    """
+    return jsonify(get_pool_stats())
+
+
+@admin_routes.route("/admin/activity-log-stats")
+@login_required
+@role_required("admin")
+def activity_log_stats():
+    """
+    Audit log writer counters (queued, written, dropped, failed).
+    """
+    return jsonify(get_activity_log_stats())
+
+
+@admin_routes.route("/admin/notification-stats")
+@login_required
+@role_required("admin")
+def notification_stats():
+    """
+    New-job notification fan-outs waiting, sent, dropped and failed.
+    """
+    return jsonify(get_notification_fanout_stats())
+
+
+@admin_routes.route("/admin/diagnostics")
+@login_required
+@role_required("admin")
+def diagnostics():
+    """
+    SQL profiler results: top statements by total time and recently flagged
+    (slow, repeated-statement or N+1) requests.
+    """
+    return render_template("admin_diagnostics.html", report=get_profiler_report())
+
+
+@admin_routes.route("/admin/diagnostics/reset", methods=["POST"])
+@login_required
+@role_required("admin")
+def reset_diagnostics():
+    reset_profiler()
+    flash("Profiler statistics cleared.", "success")
+    return redirect(url_for("admin_routes.diagnostics"))
+
+
+@admin_routes.route("/admin/db-routing")
+@login_required
+@role_required("admin")
+def db_routing():
+    """
+    Read/write routing counters and each replica's lag and pool stats.
+    """
+    return jsonify(get_routing_stats())
+
+
+@admin_routes.route("/admin/job-sweep-stats")
+@login_required
+@role_required("admin")
+def job_sweep_stats():
+    """
+    Jobs closed by the expiry sweeper, and the last sweep's count and duration.
+    """
+    return jsonify(get_job_sweep_stats())
+
+
+@admin_routes.route("/admin/job-view-stats")
+@login_required
+@role_required("admin")
+def job_view_stats():
+    """
+    Buffered job views awaiting a flush, and views dropped while flushes failed.
+    """
+    return jsonify(get_job_view_stats())
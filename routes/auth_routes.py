@@ -1,14 +1,18 @@
 from flask import Blueprint, session, render_template, redirect, request, url_for, flash
 from models.student import save_student_profile
 from auth.auth import (
+    hash_password,
     verify_password,
+    password_needs_rehash,
+    HashingOverloadedError,
     validate_password_strength_medium,
     validate_email,
     validate_username,
     sanitize_input
 )
 from models.company import save_company_profile
-from models.user import get_user_by_email, register_user
+from models.user import get_user_by_email, register_user, record_login
+from models.activity_log import log_activity
 
 auth_routes = Blueprint("auth_routes", __name__)
 
@@ -59,6 +63,9 @@ def register_student():
             flash("Registration successful! Please login.", "success")
             return redirect(url_for("auth_routes.login"))
             
+        except HashingOverloadedError:
+            flash("The server is busy right now. Please try again in a moment.", "error")
+            return render_template("register_student.html"), 503
         except ValueError:
             flash("Email or username already exists. Please try again.", "error")
         except Exception as e:
@@ -123,6 +130,9 @@ def register_company():
             flash("Company registration successful! Please login.", "success")
             return redirect(url_for("auth_routes.login"))
             
+        except HashingOverloadedError:
+            flash("The server is busy right now. Please try again in a moment.", "error")
+            return render_template("register_company.html"), 503
         except ValueError:
             flash("Email or username already exists. Please try again.", "error")
         except Exception as e:
@@ -158,28 +168,31 @@ def login():
             flash("Your account has been deactivated. Please contact administrator.", "error")
             return render_template("login.html")
         
-        if not verify_password(password, user["password"]):
+        try:
+            password_ok = verify_password(password, user["password"])
+        except HashingOverloadedError:
+            # Fail fast instead of queueing behind a login storm
+            flash("The server is busy right now. Please try again in a moment.", "error")
+            return render_template("login.html"), 503
+
+        if not password_ok:
             flash("Invalid email or password. Please try again.", "error")
             return render_template("login.html")
 
-        # Update last login timestamp
+        # Update last login timestamp, upgrading the hash if it is below policy
         try:
-            from db import get_db_connection
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = %s",
-                (user["id"],)
-            )
-            conn.commit()
-            cursor.close()
-            conn.close()
+            new_hash = hash_password(password) if password_needs_rehash(user["password"]) else None
+        except HashingOverloadedError:
+            new_hash = None  # Upgrade on a later login
+        try:
+            record_login(user["id"], new_hash)
         except:
             pass  # If update fails, continue anyway
 
         role = user["role"].strip().lower()
         session["user_id"] = user["id"]
         session["role"] = role
+        log_activity("login", entity_type="user", entity_id=user["id"])
 
         flash(f"Welcome back! Logged in as {role}.", "success")
         
@@ -201,6 +214,8 @@ def login():
 
 @auth_routes.route("/logout")
 def logout():
+    if "user_id" in session:
+        log_activity("logout", entity_type="user", entity_id=session["user_id"])
     session.clear()
     flash("You have been logged out successfully.", "success")
     return redirect(url_for("auth_routes.login"))
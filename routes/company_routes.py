@@ -1,12 +1,52 @@
-from flask import Blueprint, render_template, request, session, redirect, url_for, flash
-from routes.decorators import login_required, role_required
+import csv
+import io
+import math
+import tempfile
+from flask import (Blueprint, render_template, request, session, redirect, url_for, flash,
+                   Response, stream_with_context, send_file)
+from routes.decorators import login_required, role_required, get_current_identity
 from models.company import (
     save_company_profile,
-    get_company_profile,
-    get_company_id_by_user_id
+    get_company_profile
 )
-from models.job import create_job, get_jobs_by_company
-from models.application import get_applicants_for_company_job
+from models.job import create_job, close_job, get_jobs_by_company, APPLICATION_STATUSES
+from models.application import (
+    get_applicants_for_company_job,
+    bulk_update_application_status,
+    iter_applicants_for_export,
+    APPLICANT_EXPORT_COLUMNS
+)
+from models.ranking import get_ranked_applicants, DEFAULT_RANKING_WEIGHTS
+from models import async_data
+
+# XLSX export is optional: pip install openpyxl
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+# A spreadsheet runs a cell starting with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _spreadsheet_safe(row):
+    """Quote text cells that Excel or LibreOffice would evaluate (CSV/formula injection)."""
+    return [f"'{value}" if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) else value
+            for value in row]
+
+
+def _float_arg(name):
+    """A float query parameter, None if absent; raises ValueError if it is not a number."""
+    value = request.args.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a number")
+    return number
 
 company_routes = Blueprint("company_routes", __name__)
 
@@ -43,8 +83,7 @@ def company_profile():
 @login_required
 @role_required("company")
 def post_job():
-    user_id = session["user_id"]
-    company_id = get_company_id_by_user_id(user_id)
+    company_id = get_current_identity()["company_id"]
 
     if not company_id:
         flash("Please complete your company profile first.", "error")
@@ -95,22 +134,154 @@ def post_job():
     return render_template("post_job.html", jobs=jobs)
 
 
+@company_routes.route("/company/jobs/<int:job_id>/close", methods=["POST"])
+@login_required
+@role_required("company")
+def close_job_posting(job_id):
+    company_id = get_current_identity()["company_id"]
+    try:
+        if company_id and close_job(company_id, job_id):
+            flash("Job closed. It no longer accepts applications.", "success")
+        else:
+            flash("Job not found or already closed.", "error")
+    except Exception as e:
+        flash(f"An error occurred while closing the job: {str(e)}", "error")
+    return redirect(url_for("company_routes.post_job"))
+
+
 @company_routes.route("/company/applicants/<int:job_id>")
 @login_required
 @role_required("company")
 def view_applicants(job_id):
+    ranked = request.args.get("rank") == "1"
     try:
-        company_id = get_company_id_by_user_id(session["user_id"])
+        company_id = get_current_identity()["company_id"]
         if not company_id:
             flash("Company profile not found.", "error")
             return redirect(url_for("company_routes.company_profile"))
         
-        applicants = get_applicants_for_company_job(company_id, job_id)
+        if ranked:
+            # ?rank=1&top=50&w_skills=0.6&w_cgpa=0.3&w_course=0.1
+            weights = {key: request.args.get(f"w_{key}", default, type=float)
+                       for key, default in DEFAULT_RANKING_WEIGHTS.items()}
+            top_n = request.args.get("top", type=int)
+            try:
+                _, applicants = get_ranked_applicants(company_id, job_id, weights=weights, top_n=top_n)
+            except ValueError as e:
+                flash(f"Invalid ranking options: {str(e)}", "error")
+                ranked = False
+                applicants = get_applicants_for_company_job(company_id, job_id)
+        else:
+            applicants = get_applicants_for_company_job(company_id, job_id)
     except Exception as e:
         flash(f"Error loading applicants: {str(e)}", "error")
         applicants = []
     
-    return render_template("company_applicants.html", applicants=applicants)
+    return render_template("company_applicants.html",
+                         applicants=applicants,
+                         job_id=job_id,
+                         ranked=ranked,
+                         statuses=APPLICATION_STATUSES)
+
+
+@company_routes.route("/company/applicants/<int:job_id>/status", methods=["POST"])
+@login_required
+@role_required("company")
+def bulk_update_applicants(job_id):
+    """
+    Apply one status (and optional note) to all selected applicants.
+    """
+    company_id = get_current_identity()["company_id"]
+    if not company_id:
+        flash("Company profile not found.", "error")
+        return redirect(url_for("company_routes.company_profile"))
+
+    application_ids = request.form.getlist("application_ids")
+    status = request.form.get("status", "")
+    notes = request.form.get("notes", "").strip() or None
+
+    if not application_ids:
+        flash("Select at least one applicant.", "error")
+        return redirect(url_for("company_routes.view_applicants", job_id=job_id))
+
+    try:
+        result = bulk_update_application_status(company_id, job_id, application_ids, status, notes)
+        changed = ", ".join(f"{count} {previous}" for previous, count in result["previous_statuses"].items())
+        flash(f"Marked {result['updated']} application(s) as {status} ({changed}).", "success")
+    except ValueError as e:
+        flash(f"Invalid input: {str(e)}", "error")
+    except Exception as e:
+        flash(f"An error occurred while updating applications: {str(e)}", "error")
+
+    return redirect(url_for("company_routes.view_applicants", job_id=job_id))
+
+
+@company_routes.route("/company/applicants/<int:job_id>/export")
+@login_required
+@role_required("company")
+def export_applicants(job_id):
+    """
+    Download applicants as CSV (streamed) or XLSX, optionally filtered by
+    status and CGPA range.
+    """
+    company_id = get_current_identity()["company_id"]
+    if not company_id:
+        flash("Company profile not found.", "error")
+        return redirect(url_for("company_routes.company_profile"))
+
+    file_format = request.args.get("format", "csv").lower()
+    status = request.args.get("status") or None
+    try:
+        min_cgpa = _float_arg("min_cgpa")
+        max_cgpa = _float_arg("max_cgpa")
+        if status and status not in APPLICATION_STATUSES:
+            raise ValueError(f"Invalid status: {status}")
+        if file_format not in ("csv", "xlsx"):
+            raise ValueError(f"Unsupported format: {file_format}")
+        if file_format == "xlsx" and Workbook is None:
+            raise ValueError("XLSX export requires the openpyxl package")
+    except ValueError as e:
+        flash(f"Invalid input: {str(e)}", "error")
+        return redirect(url_for("company_routes.view_applicants", job_id=job_id))
+
+    rows = iter_applicants_for_export(company_id, job_id, status=status,
+                                      min_cgpa=min_cgpa, max_cgpa=max_cgpa)
+    filename = f"applicants_job_{job_id}.{file_format}"
+
+    if file_format == "xlsx":
+        # Write-only workbooks keep rows on disk, not in memory
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Applicants")
+        sheet.append(APPLICANT_EXPORT_COLUMNS)
+        for row in rows:
+            sheet.append(_spreadsheet_safe(row))
+        output = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        workbook.save(output)
+        output.seek(0)
+        return send_file(
+            output,
+            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            as_attachment=True,
+            download_name=filename
+        )
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(APPLICANT_EXPORT_COLUMNS)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(_spreadsheet_safe(row))
+            if count % 500 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(generate_csv()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 
 @company_routes.route("/company/dashboard")
@@ -118,33 +289,26 @@ def view_applicants(job_id):
 @role_required("company")
 def company_dashboard():
     try:
-        user_id = session["user_id"]
-        company = get_company_profile(user_id)
-        
-        # Get statistics
-        company_id = get_company_id_by_user_id(user_id)
-        jobs = get_jobs_by_company(company_id) if company_id else []
-        jobs_count = len(jobs)
-        active_jobs_count = len([job for job in jobs if job.get('status') == 'active'])
-        
-        # Count total applicants (simplified - you might want to optimize this)
-        total_applicants = 0
-        for job in jobs:
-            try:
-                applicants = get_applicants_for_company_job(company_id, job['id'])
-                total_applicants += len(applicants)
-            except:
-                pass
+        # Profile and the grouped job/applicant counts are read concurrently
+        [(company, stats)] = async_data.run_concurrently(
+            async_data.company_dashboard(session["user_id"], get_current_identity()["company_id"])
+        )
         
         return render_template("company_dashboard.html",
                              company=company,
-                             jobs_count=jobs_count,
-                             active_jobs_count=active_jobs_count,
-                             total_applicants=total_applicants)
+                             jobs_count=stats["total_jobs"] if stats else 0,
+                             active_jobs_count=stats["active_jobs"] if stats else 0,
+                             total_applicants=stats["total_applications"] if stats else 0,
+                             total_views=stats["total_views"] if stats else 0,
+                             applicants_by_status=stats["applicants_by_status"] if stats else {},
+                             job_stats=stats["jobs"] if stats else [])
     except Exception as e:
         flash(f"Error loading dashboard: {str(e)}", "error")
         return render_template("company_dashboard.html",
                              company=None,
                              jobs_count=0,
                              active_jobs_count=0,
-                             total_applicants=0)
+                             total_applicants=0,
+                             total_views=0,
+                             applicants_by_status={},
+                             job_stats=[])
@@ -1,11 +1,24 @@
 from functools import wraps
-from flask import session, redirect, url_for, flash
-from models.user import get_user_by_id
+from flask import session, redirect, render_template, url_for, flash, g
+from models.user import get_identity
+
+
+def get_current_identity():
+    """
+    Identity of the logged-in user (id, role, is_active, student_id, company_id),
+    resolved at most once per request. Returns None if nobody is logged in.
+    """
+    if "identity" not in g:
+        user_id = session.get("user_id")
+        g.identity = get_identity(user_id) if user_id is not None else None
+    return g.identity
+
 
 def login_required(fn):
     """
     Decorator to ensure user is logged in.
-    Redirects to login page if not authenticated.
+    Redirects to login page if not authenticated. Once it passes, the view
+    can rely on get_current_identity() returning the user's identity.
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
@@ -13,15 +26,24 @@ def login_required(fn):
             flash("Please login to access this page.", "error")
             return redirect(url_for("auth_routes.login"))
         
-        # Optional: Check if user is still active
         try:
-            user = get_user_by_id(session["user_id"])
-            if user and not user.get("is_active", True):
-                session.clear()
-                flash("Your account has been deactivated. Please contact administrator.", "error")
-                return redirect(url_for("auth_routes.login"))
-        except:
-            pass  # If user check fails, continue anyway
+            identity = get_current_identity()
+        except Exception:
+            # Database unavailable: keep the session, but don't run the view without an identity
+            g.pop("identity", None)
+            flash("We couldn't verify your session right now. Please try again in a moment.", "error")
+            return render_template("login.html"), 503
+        
+        if identity and not identity["is_active"]:
+            session.clear()
+            flash("Your account has been deactivated. Please contact administrator.", "error")
+            return redirect(url_for("auth_routes.login"))
+        
+        if identity is None:
+            # Account no longer exists
+            session.clear()
+            flash("Please login to access this page.", "error")
+            return redirect(url_for("auth_routes.login"))
         
         return fn(*args, **kwargs)
     return wrapper
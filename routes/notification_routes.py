@@ -0,0 +1,53 @@
+from flask import Blueprint, render_template, session, request, flash, redirect, url_for
+from routes.decorators import login_required
+
+from models.notification import (
+    get_unread_count,
+    get_notifications_page,
+    mark_notifications_read
+)
+
+notification_routes = Blueprint("notification_routes", __name__)
+
+
+@notification_routes.app_context_processor
+def inject_unread_notifications():
+    """Unread count for the navigation bar (cached, see models.notification)."""
+    user_id = session.get("user_id")
+    if user_id is None:
+        return {}
+    try:
+        return {"unread_notifications": get_unread_count(user_id)}
+    except Exception:
+        return {}
+
+
+@notification_routes.route("/notifications")
+@login_required
+def inbox():
+    try:
+        page = get_notifications_page(session["user_id"], before_id=request.args.get("before", type=int))
+    except Exception as e:
+        flash(f"Error loading notifications: {str(e)}", "error")
+        page = {"notifications": [], "next_cursor": None}
+
+    next_url = url_for("notification_routes.inbox", before=page["next_cursor"]) if page["next_cursor"] else None
+    return render_template("notifications.html",
+                         notifications=page["notifications"],
+                         next_url=next_url)
+
+
+@notification_routes.route("/notifications/read", methods=["POST"])
+@login_required
+def mark_read():
+    """Mark the selected notifications as read, or all of them with all=1."""
+    try:
+        if request.form.get("all"):
+            updated = mark_notifications_read(session["user_id"])
+        else:
+            updated = mark_notifications_read(session["user_id"],
+                                              request.form.getlist("notification_ids", type=int))
+        flash(f"Marked {updated} notification(s) as read.", "success")
+    except Exception as e:
+        flash(f"Error updating notifications: {str(e)}", "error")
+    return redirect(url_for("notification_routes.inbox"))
@@ -0,0 +1,104 @@
+"""
+Rendered-page cache with conditional GET.
+
+Views wrapped with @cache_response keep their rendered HTML per page, role
+and navigation-bar state for RESPONSE_CACHE_TTL seconds, and send an ETag
+and Last-Modified derived from the jobs version stamp (models.job), so
+browsers revalidating an unchanged page get a 304 without it being rendered.
+Creating or closing a job, or a job filling up, bumps the stamp.
+
+Set RESPONSE_CACHE_ENDPOINTS to a comma-separated list of endpoint names
+(e.g. "student_routes.view_jobs") to limit which wrapped views take
+part; an empty value turns the cache off. The stamp is shared between app
+processes through cache_versions, so a change made on another worker reaches
+browsers, 304s included, within JOBS_VERSION_REFRESH seconds.
+
+Pages that flash a message are never cached.
+"""
+import hashlib
+import os
+from datetime import date, datetime, time, timezone
+from functools import wraps
+
+from flask import g, make_response, message_flashed, request, session
+
+from cache import TTLCache
+from models.job import get_jobs_version
+from models.notification import get_unread_count
+
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", 60))
+
+_endpoints = os.environ.get("RESPONSE_CACHE_ENDPOINTS")
+RESPONSE_CACHE_ENDPOINTS = (None if _endpoints is None
+                            else frozenset(e.strip() for e in _endpoints.split(",") if e.strip()))
+
+_response_cache = TTLCache(maxsize=2000, ttl=RESPONSE_CACHE_TTL)
+
+
+def _on_flash(sender, **extra):
+    g.response_flashed = True
+
+
+message_flashed.connect(_on_flash)
+
+
+def _variant():
+    """What besides the page itself changes the HTML: role and unread badge."""
+    user_id = session.get("user_id")
+    if user_id is None:
+        return None
+    try:
+        unread = get_unread_count(user_id)
+    except Exception:
+        unread = None
+    return session.get("role"), unread
+
+
+def _validators():
+    """(ETag, Last-Modified) for the current request."""
+    today = date.today()
+    version = get_jobs_version()
+    # Jobs past their deadline drop off at midnight without a bump
+    last_modified = max(datetime.fromtimestamp(version, timezone.utc),
+                        datetime.combine(today, time.min).astimezone(timezone.utc))
+    key = repr((request.full_path, _variant(), version, today.isoformat()))
+    return hashlib.sha1(key.encode()).hexdigest()[:20], last_modified
+
+
+def _with_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Per-user navigation bar: browsers may keep it, shared caches may not
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def cache_response(view):
+    """Serve GETs from the page cache and answer conditional requests with 304."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if (request.method != "GET"
+                or session.get("_flashes")
+                or (RESPONSE_CACHE_ENDPOINTS is not None and request.endpoint not in RESPONSE_CACHE_ENDPOINTS)):
+            return view(*args, **kwargs)
+
+        etag, last_modified = _validators()
+        if request.if_none_match:
+            if request.if_none_match.contains(etag):
+                return _with_validators(make_response("", 304), etag, last_modified)
+        elif request.if_modified_since and request.if_modified_since >= last_modified.replace(microsecond=0):
+            return _with_validators(make_response("", 304), etag, last_modified)
+
+        cached = _response_cache.get(etag)
+        if cached is not None:
+            body, mimetype = cached
+            response = make_response(body)
+            response.mimetype = mimetype
+            return _with_validators(response, etag, last_modified)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200 or g.get("response_flashed") or response.direct_passthrough:
+            return response
+        _response_cache.set(etag, (response.get_data(), response.mimetype))
+        return _with_validators(response, etag, last_modified)
+    return wrapper
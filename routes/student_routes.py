@@ -1,22 +1,38 @@
+from datetime import datetime
 from flask import Blueprint, render_template, session, request, flash, redirect, url_for
-from routes.decorators import login_required, role_required
+from routes.decorators import login_required, role_required, get_current_identity
+from routes.response_cache import cache_response
 
 from models.student import (
     save_student_profile,
     get_student_profile,
-    get_student_id_by_user_id
+    get_student_dashboard_data
 )
 
 from models.application import (
-    has_applied,
     apply_for_job,
-    get_applications_for_student
+    get_applications_for_student,
+    APPLY_OK,
+    APPLY_DUPLICATE,
+    APPLY_NOT_FOUND,
+    APPLY_CLOSED,
+    APPLY_DEADLINE_PASSED,
+    APPLY_FULL
 )
 
-from models.job import get_active_jobs, get_job_by_id
+from models.job import get_job_board_page, get_job_by_id, search_jobs
+from models.recommendations import get_recommended_jobs
 
 student_routes = Blueprint("student_routes", __name__)
 
+APPLY_MESSAGES = {
+    APPLY_DUPLICATE: "You have already applied for this job.",
+    APPLY_NOT_FOUND: "Job not found or no longer available.",
+    APPLY_CLOSED: "This job is no longer accepting applications.",
+    APPLY_DEADLINE_PASSED: "The application deadline for this job has passed.",
+    APPLY_FULL: "This job has reached its maximum number of applications.",
+}
+
 
 @student_routes.route("/student/profile", methods=["GET", "POST"])
 @login_required
@@ -60,7 +76,7 @@ def student_profile():
 @login_required
 @role_required("student")
 def apply_job(job_id):
-    student_id = get_student_id_by_user_id(session["user_id"])
+    student_id = get_current_identity()["student_id"]
     
     if not student_id:
         flash("Student profile not found. Please complete your profile first.", "error")
@@ -68,11 +84,11 @@ def apply_job(job_id):
 
     if request.method == "POST":
         try:
-            if has_applied(student_id, job_id):
-                flash("You have already applied for this job.", "error")
+            result = apply_for_job(student_id, job_id)
+            if result["status"] != APPLY_OK:
+                flash(APPLY_MESSAGES[result["status"]], "error")
                 return redirect(url_for("student_routes.view_jobs"))
 
-            apply_for_job(student_id, job_id)
             flash("Application submitted successfully!", "success")
             return redirect(url_for("student_routes.my_applications"))
         except Exception as e:
@@ -89,14 +105,62 @@ def apply_job(job_id):
 @student_routes.route("/jobs")
 @login_required
 @role_required("student")
+@cache_response
 def view_jobs():
     try:
-        jobs = get_active_jobs()
+        page = get_job_board_page(
+            after=request.args.get("after"),
+            before=request.args.get("before")
+        )
     except Exception as e:
         flash(f"Error loading jobs: {str(e)}", "error")
-        jobs = []
+        page = {"jobs": [], "next_cursor": None, "prev_cursor": None}
+    
+    return render_template("jobs.html",
+                         jobs=page["jobs"],
+                         search={},
+                         prev_url=url_for("student_routes.view_jobs", before=page["prev_cursor"]) if page["prev_cursor"] else None,
+                         next_url=url_for("student_routes.view_jobs", after=page["next_cursor"]) if page["next_cursor"] else None)
+
+
+@student_routes.route("/jobs/search")
+@login_required
+@role_required("student")
+@cache_response
+def search_jobs_view():
+    search = {
+        "q": request.args.get("q", "").strip(),
+        "job_type": request.args.get("job_type", "").strip(),
+        "location": request.args.get("location", "").strip(),
+        "salary_min": request.args.get("salary_min", "").strip(),
+        "salary_max": request.args.get("salary_max", "").strip(),
+        "deadline_from": request.args.get("deadline_from", "").strip(),
+    }
+    page = request.args.get("page", 1, type=int)
     
-    return render_template("jobs.html", jobs=jobs)
+    try:
+        result = search_jobs(
+            query=search["q"],
+            job_type=search["job_type"] or None,
+            location=search["location"] or None,
+            salary_min=float(search["salary_min"]) if search["salary_min"] else None,
+            salary_max=float(search["salary_max"]) if search["salary_max"] else None,
+            deadline_from=datetime.strptime(search["deadline_from"], "%Y-%m-%d").date() if search["deadline_from"] else None,
+            page=page
+        )
+    except ValueError as e:
+        flash(f"Invalid search filter: {str(e)}", "error")
+        result = {"jobs": [], "page": 1, "has_next": False}
+    except Exception as e:
+        flash(f"Error searching jobs: {str(e)}", "error")
+        result = {"jobs": [], "page": 1, "has_next": False}
+    
+    filters = {k: v for k, v in search.items() if v}
+    return render_template("jobs.html",
+                         jobs=result["jobs"],
+                         search=search,
+                         prev_url=url_for("student_routes.search_jobs_view", page=result["page"] - 1, **filters) if result["page"] > 1 else None,
+                         next_url=url_for("student_routes.search_jobs_view", page=result["page"] + 1, **filters) if result["has_next"] else None)
 
 
 @student_routes.route("/my-applications")
@@ -104,7 +168,7 @@ def view_jobs():
 @role_required("student")
 def my_applications():
     try:
-        student_id = get_student_id_by_user_id(session["user_id"])
+        student_id = get_current_identity()["student_id"]
         if not student_id:
             flash("Student profile not found.", "error")
             return redirect(url_for("student_routes.student_profile"))
@@ -122,25 +186,25 @@ def my_applications():
 @role_required("student")
 def student_dashboard():
     try:
-        user_id = session["user_id"]
-        profile = get_student_profile(user_id)
+        # Profile and all counts in a single query; recommendations need its skills
+        profile, stats = get_student_dashboard_data(session["user_id"])
         
-        # Get statistics
-        student_id = get_student_id_by_user_id(user_id)
-        applications = get_applications_for_student(student_id) if student_id else []
-        applications_count = len(applications)
-        pending_applications = len([app for app in applications if app.get('status') == 'pending'])
-        active_jobs = len(get_active_jobs())
+        try:
+            recommended_jobs = get_recommended_jobs(profile["id"], profile["skills"]) if profile else []
+        except Exception:
+            recommended_jobs = []  # Recommendations are optional on the dashboard
         
         return render_template("student_dashboard.html", 
                              profile=profile,
-                             applications_count=applications_count,
-                             pending_applications=pending_applications,
-                             active_jobs=active_jobs)
+                             applications_count=stats["total_applications"],
+                             pending_applications=stats["pending_applications"],
+                             active_jobs=stats["active_jobs"],
+                             recommended_jobs=recommended_jobs)
     except Exception as e:
         flash(f"Error loading dashboard: {str(e)}", "error")
         return render_template("student_dashboard.html", 
                              profile=None,
                              applications_count=0,
                              pending_applications=0,
-                             active_jobs=0)
+                             active_jobs=0,
+                             recommended_jobs=[])
@@ -0,0 +1,30 @@
+"""
+Job Expiry Sweep
+Closes every active job past its application deadline (or already full), for
+running from cron when the app's own sweeper is off (JOB_SWEEP_INTERVAL=0).
+Skips the run if another process is sweeping.
+
+Usage:
+    python sweep_jobs.py [--batch-size 500]
+"""
+
+import argparse
+
+from models.job import close_expired_jobs, JOB_SWEEP_BATCH_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Close expired and full jobs")
+    parser.add_argument("--batch-size", type=int, default=JOB_SWEEP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    result = close_expired_jobs(batch_size=args.batch_size)
+    if result is None:
+        print("Another process is already sweeping; nothing done.")
+        return
+    print(f"✅ Closed {result['closed']} jobs ({result['expired']} past deadline, "
+          f"{result['full']} full) in {result['seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()